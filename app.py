@@ -1,334 +1,192 @@
 import streamlit as st
-from PIL import Image
-import pytesseract
-import tweepy
-from transformers import pipeline
-import re
 import os
+import atexit
 from dotenv import load_dotenv
-from email_validator import validate_email, EmailNotValidError
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime
 import time
-from collections import defaultdict
-import hashlib
-import tempfile
-import json
 
-# Configurações iniciais
+# Configurações iniciais (antes dos módulos do app, que leem o ambiente ao serem importados)
 load_dotenv()
 
-# Configuração do Tesseract OCR
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# pandas, tweepy, requests, BeautifulSoup e transformers só são importados no primeiro uso
+from links import analyze_pages
+from browser import DriverPool
+from classifier import ValidatorLoader, backend_id, ClassificationCache
+from health import serve_health
+from vocabulary import get_vocabulary
+from twitter_analysis import fetch_twitter_profile, get_twitter_client as create_twitter_client
+from twitter_records import TwitterProfile
+from twitter_cache import ProfileCache
+from registry import FanRegistry
+from fan_profile import generate_fan_profile
+from validators import validate_cpf, validate_email_address
+from ocr import OCRQueue, QueueFull
+from metrics import get_metrics, observe, register_stats, timed
+from rules import rules_stats
+from org_accounts import org_stats
 
 # Configurações
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-MAX_TWEETS = 5
-MAX_FOLLOWING = 100
-ORGANIZACOES_ESPORTS = ["furia", "loud", "mibr", "g2esports", "fnatic", "navi", "teamliquid"]
-JOGOS_ESPORTS = ["lol", "league of legends", "csgo", "valorant", "dota", "fortnite", "rainbow six"]
+OCR_POLL_INTERVAL = 1  # Segundos entre consultas ao job de OCR
+LIVE_TABLE_INTERVAL = 0.2  # Intervalo mínimo (s) entre atualizações da tabela de links em andamento
+MODEL_WAIT_TIMEOUT = float(os.getenv("MODEL_WAIT_TIMEOUT", "60"))  # Espera máxima (s) pelo modelo ao validar links
+DEBUG_PANEL = os.getenv("DEBUG_PANEL", "0") == "1"  # Também ativado com ?debug=1 na URL
 
 # Inicializa session_state se não existir
 if 'user_data' not in st.session_state:
     st.session_state.user_data = {}
 
-# Twitter API setup - modificado para ser opcional
+# Cliente da API do Twitter, criado só na primeira análise e reaproveitado entre reruns e sessões
+@st.cache_resource
 def get_twitter_client():
-    try:
-        return tweepy.Client(
-            bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
-            consumer_key=os.getenv('TWITTER_API_KEY'),
-            consumer_secret=os.getenv('TWITTER_API_SECRET'),
-            access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
-            access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
-        )
-    except Exception as e:
-        st.warning(f"Twitter API não configurada corretamente: {str(e)}")
+    return create_twitter_client()
+
+# Pool de navegadores compartilhado entre todas as sessões do processo
+# (encerrado quando o cache é limpo ou o processo termina, para não deixar Chromes órfãos)
+@st.cache_resource(on_release=lambda pool: pool.close())
+def get_driver_pool():
+    pool = DriverPool()
+    atexit.register(pool.close)
+    register_stats("driver_pool", pool.stats)
+    return pool
+
+# Modelo de classificação aquecido em segundo plano desde a inicialização do app
+@st.cache_resource
+def get_validator_loader():
+    loader = ValidatorLoader()
+    register_stats("validator", loader.status)
+    return loader.start()
+
+# Endpoint de prontidão para o load balancer (opcional, via HEALTH_PORT)
+# Fora do cache_resource: a porta fica aberta uma vez por processo e só passa a consultar o loader atual
+def get_health_server():
+    port = os.getenv("HEALTH_PORT")
+    if not port:
         return None
+    return serve_health(int(port), get_validator_loader().status, metrics_fn=get_metrics().render)
+
+get_validator_loader()
+get_health_server()
 
-twitter_client = get_twitter_client()
+# Cache persistente das classificações de páginas
+@st.cache_resource
+def get_classification_cache():
+    cache = ClassificationCache()
+    register_stats("classification_cache", cache.stats)
+    return cache
+
+# Cache de perfis compartilhado entre sessões (e entre réplicas com os backends sqlite/redis)
+@st.cache_resource
+def get_twitter_cache():
+    cache = ProfileCache()
+    register_stats("twitter_cache", cache.stats)
+    return cache
+
+# Fila de OCR em processos separados, compartilhada entre sessões
+@st.cache_resource(on_release=lambda fila: fila.close())
+def get_ocr_queue():
+    fila = OCRQueue()
+    atexit.register(fila.close)
+    register_stats("ocr_queue", fila.stats)
+    return fila
+
+# Cadastro de fãs (SQLite) compartilhado entre sessões
+@st.cache_resource
+def get_registry():
+    return FanRegistry()
+
+register_stats("fan_rules", rules_stats)
+register_stats("org_accounts", org_stats)
 
-# Cache para melhorar performance
-@st.cache_data(ttl=3600)
 def analyze_twitter_profile(username):
     """Analisa o perfil do Twitter e retorna dados estruturados"""
-    if not twitter_client:
-        st.warning("Twitter API não está configurada corretamente")
+    import tweepy
+    
+    try:
+        twitter_client = get_twitter_client()
+    except Exception as e:
+        st.warning(f"Twitter API não configurada corretamente: {str(e)}")
         return None
+    
+    def buscar():
+        perfil = fetch_twitter_profile(twitter_client, username)
+        # Payload compacto (só tipos JSON): barato de copiar no cache e de salvar em disco
+        return perfil.to_dict() if perfil else None
         
     try:
-        user = twitter_client.get_user(username=username, user_fields=["public_metrics", "description", "profile_image_url"])
-        user_id = user.data.id
-        
-        # Busca tweets recentes
-        tweets = twitter_client.get_users_tweets(
-            id=user_id, 
-            max_results=MAX_TWEETS, 
-            tweet_fields=["created_at", "public_metrics", "entities"]
-        )
-        
-        # Busca contas seguidas
-        following = twitter_client.get_users_following(
-            id=user_id, 
-            max_results=MAX_FOLLOWING, 
-            user_fields=["name", "username", "description"]
-        )
-        
-        return {
-            "user": user.data,
-            "tweets": tweets.data if tweets.data else [],
-            "following": following.data if following.data else []
-        }
+        with timed("twitter_profile"):
+            twitter_data = get_twitter_cache().get_or_fetch(username, buscar)
+        if twitter_data is None:
+            st.warning(f"Usuário @{username} não encontrado no Twitter")
+        return twitter_data
     except tweepy.errors.TweepyException as e:
         st.error(f"Erro ao buscar dados do Twitter: {str(e)}")
         return None
 
-def validate_cpf(cpf: str) -> bool:
-    """Valida um CPF brasileiro"""
-    cpf = ''.join(filter(str.isdigit, cpf))
-    
-    if len(cpf) != 11:
-        return False
-    
-    # Verifica dígitos repetidos
-    if cpf == cpf[0] * 11:
-        return False
-    
-    # Calcula o primeiro dígito verificador
-    soma = 0
-    for i in range(9):
-        soma += int(cpf[i]) * (10 - i)
-    resto = 11 - (soma % 11)
-    digito1 = resto if resto < 10 else 0
-    
-    # Calcula o segundo dígito verificador
-    soma = 0
-    for i in range(10):
-        soma += int(cpf[i]) * (11 - i)
-    resto = 11 - (soma % 11)
-    digito2 = resto if resto < 10 else 0
-    
-    return cpf[-2:] == f"{digito1}{digito2}"
-
-def validate_email_address(email: str) -> bool:
-    """Valida um endereço de email"""
+def process_document(uploaded_file):
+    """Envia o documento de identidade (imagem ou PDF) para a fila de OCR e retorna o job (None se não foi aceito)"""
     try:
-        v = validate_email(email)
-        return True
-    except EmailNotValidError:
-        return False
+        with timed("ocr_submit"):
+            return get_ocr_queue().submit(uploaded_file.getvalue())
+    except QueueFull as e:
+        st.warning(f"{str(e)}. Tente novamente em alguns segundos.")
+        return None
 
-def process_document(uploaded_file):
-    """Processa documento de identidade usando OCR"""
+@st.fragment(run_every=OCR_POLL_INTERVAL)
+def wait_document(job):
+    """Acompanha o job de OCR sem bloquear o restante da página"""
+    if job.done():
+        st.rerun()
+    fila = get_ocr_queue()
+    stats = fila.stats()
+    st.info(
+        f"Processando documento... {fila.position(job)} documento(s) à frente · "
+        f"fila: {stats['queued']} · aguardando há {time.time() - job.submitted_at:.0f}s · "
+        f"espera média: {stats['wait_seconds_avg']:.1f}s"
+    )
+
+def show_document_result(job):
+    """Mostra o texto extraído e confere o CPF com o informado no formulário"""
     try:
-        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_file_path = tmp_file.name
-        
-        # Para PDFs precisaríamos de conversão para imagem
-        if uploaded_file.type == "application/pdf":
-            st.warning("Suporte a PDF requer bibliotecas adicionais como pdf2image")
-            return None
-        
-        image = Image.open(tmp_file_path)
-        texto = pytesseract.image_to_string(image, lang='por')
-        
-        # Padroniza CPF no texto extraído
-        cpfs = re.findall(r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}', texto)
-        if cpfs:
-            texto += f"\n\nCPF encontrado: {cpfs[0]}"
-        
-        os.unlink(tmp_file_path)
-        return texto
+        resultado = job.result()
     except Exception as e:
         st.error(f"Erro ao processar documento: {str(e)}")
-        return None
+        return
+    if resultado["text"]:
+        st.text_area("Texto extraído (OCR)", resultado["text"], height=200)
+    if resultado["cpf"]:
+        st.caption(f"CPF encontrado: {resultado['cpf']} (confiança {resultado['confidence']:.0%})")
+    
+    # Verifica correspondência de CPF (só dígitos: pontuação não importa)
+    if 'CPF' in st.session_state.user_data:
+        informado = ''.join(filter(str.isdigit, st.session_state.user_data['CPF']))
+        lidos = {''.join(filter(str.isdigit, c["cpf"])) for c in resultado["candidates"] if c["valid"]}
+        if informado in lidos:
+            st.success("CPF do documento corresponde ao informado!")
+        elif lidos:
+            st.warning("O CPF do documento não corresponde ao informado")
+        else:
+            st.warning("CPF não encontrado no documento")
 
 def analyze_links(links_list, user_interests=None):
-    """Analisa uma lista de links validando relevância para o perfil do usuário"""
-    if user_interests is None:
-        user_interests = []
-    
-    resultados = []
-    
-    # Configuração do navegador
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    
-    # Pipeline de classificação
-    @st.cache_resource
-    def get_validator():
-        return pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-    
-    validador = get_validator()
-    
-    with webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options) as driver:
-        for link in links_list:
-            try:
-                driver.get(link)
-                time.sleep(2)  # Espera carregar
-                html = driver.page_source
-                
-                soup = BeautifulSoup(html, 'html.parser')
-                texto = soup.get_text()[:2000].lower()
-                
-                # Classificação principal
-                candidate_labels = [
-                    "e-sports organization", 
-                    "competitive gaming", 
-                    "personal profile", 
-                    "gaming news", 
-                    "streaming channel",
-                    "game developer",
-                    "fan community",
-                    "esports tournament"
-                ]
-                
-                resultado = validador(texto, candidate_labels)
-                primary_category = resultado["labels"][0]
-                confidence = resultado["scores"][0]
-                
-                # Verificação de relevância
-                relevant_terms = []
-                relevance_score = 0
-                
-                # 1. Termos de e-sports genéricos
-                for term in JOGOS_ESPORTS + ORGANIZACOES_ESPORTS:
-                    if term in texto:
-                        relevant_terms.append(term)
-                        relevance_score += 1
-                
-                # 2. Interesses específicos do usuário
-                user_terms_found = []
-                for interest in user_interests:
-                    if isinstance(interest, str) and interest.lower() in texto:
-                        user_terms_found.append(interest)
-                        relevance_score += 2  # Peso maior para interesses do usuário
-                
-                # 3. Verificação de perfil pessoal (se for rede social)
-                is_personal_profile = False
-                social_platforms = ["twitter.com", "instagram.com", "twitch.tv", "youtube.com"]
-                if any(plat in link for plat in social_platforms):
-                    profile_indicators = ["profile", "perfil", "user", "sobre", "about", "bio"]
-                    if any(ind in texto for ind in profile_indicators):
-                        is_personal_profile = True
-                
-                # Determinar relevância geral
-                if relevance_score >= 3:
-                    relevance = "Alta"
-                elif relevance_score >= 1:
-                    relevance = "Média"
-                else:
-                    relevance = "Baixa"
-                
-                # Se for perfil pessoal mas não tem termos relevantes, considerar baixa relevância
-                if is_personal_profile and relevance_score == 0:
-                    relevance = "Baixa"
-                
-                resultados.append({
-                    "Link": link,
-                    "Categoria": primary_category,
-                    "Confiança": f"{confidence*100:.1f}%",
-                    "Relevância": relevance,
-                    "Termos Encontrados": ", ".join(relevant_terms),
-                    "Interesses do Usuário": ", ".join(user_terms_found),
-                    "Pontuação": relevance_score
-                })
-                
-            except Exception as e:
-                resultados.append({
-                    "Link": link,
-                    "Categoria": "Erro",
-                    "Confiança": "N/A",
-                    "Relevância": "N/A",
-                    "Termos Encontrados": f"Erro: {str(e)}",
-                    "Interesses do Usuário": "N/A",
-                    "Pontuação": 0
-                })
-    
-    return resultados
+    """Gerador com a análise de cada link, na ordem em que ficam prontos
 
-def generate_fan_profile(data):
-    """Gera um perfil completo do fã baseado nos dados coletados"""
-    profile = {
-        "basic_info": {
-            "name": data.get("Nome", ""),
-            "twitter": data.get("Twitter_Usuario", ""),
-            "email": data.get("Email", "")
-        },
-        "metrics": defaultdict(int),
-        "interests": [],
-        "recommendations": [],
-        "badges": []
-    }
-    
-    # Interesses do formulário
-    if "Interesses" in data:
-        interests = [i.strip() for i in data["Interesses"].split(",")]
-        profile["interests"] = interests
-        profile["metrics"]["interests_count"] = len(interests)
-    
-    # Eventos participados
-    if "Eventos_Participados" in data and data["Eventos_Participados"]:
-        profile["metrics"]["events_attended"] = len(data["Eventos_Participados"].split(","))
-    
-    # Compras realizadas
-    if "Compras_Realizadas" in data and data["Compras_Realizadas"]:
-        profile["metrics"]["purchases"] = len(data["Compras_Realizadas"].split(","))
-    
-    # Análise de tweets (se disponível)
-    if "twitter_data" in data and data["twitter_data"]:
-        tweets_esports = [
-            t for t in data["twitter_data"].get("tweets", [])
-            if any(org in t.text.lower() for org in ORGANIZACOES_ESPORTS) or 
-               any(game in t.text.lower() for game in JOGOS_ESPORTS)
-        ]
-        
-        profile["metrics"]["tweets_esports"] = len(tweets_esports)
-        profile["metrics"]["engagement"] = sum(
-            t.public_metrics["like_count"] + t.public_metrics["retweet_count"] 
-            for t in tweets_esports
-        )
-    
-    # Análise de contas seguidas (se disponível)
-    if "twitter_data" in data and data["twitter_data"] and data["twitter_data"].get("following"):
-        orgs_seguidas = [
-            user for user in data["twitter_data"]["following"]
-            if user.description and any(org in user.description.lower() for org in ORGANIZACOES_ESPORTS)
-        ]
-        profile["metrics"]["orgs_followed"] = len(orgs_seguidas)
-    
-    # Gerar recomendações baseadas em dados disponíveis
-    if profile["metrics"].get("orgs_followed", 0) > 3:
-        profile["recommendations"].append("Você é um fã dedicado! Considere participar de programas de fã-clube oficial.")
-    elif profile["interests"]:
-        profile["recommendations"].append(f"Baseado em seus interesses em {', '.join(profile['interests'][:3])}, siga as organizações oficiais para ficar por dentro!")
-    
-    if profile["metrics"].get("tweets_esports", 0) > 10:
-        profile["recommendations"].append("Seu alto engajamento merece recompensas! Procure por programas de embaixadores.")
-    
-    if profile["metrics"].get("events_attended", 0) > 0:
-        profile["recommendations"].append("Participar de eventos mostra seu engajamento! Continue assim!")
-    
-    # Badges baseadas em vários critérios
-    if profile["metrics"].get("interests_count", 0) >= 3:
-        profile["badges"].append("Fã Conhecedor")
-    
-    if profile["metrics"].get("purchases", 0) > 0:
-        profile["badges"].append("Apoiador")
-    
-    if profile["metrics"].get("events_attended", 0) > 0:
-        profile["badges"].append("Fã Presente")
-    
-    return profile
+    O modelo é obtido já na chamada: se ele não carregou, a exceção do
+    carregamento sobe aqui, antes de a interface da análise ser montada.
+    Se o aquecimento passar de MODEL_WAIT_TIMEOUT, sobe TimeoutError.
+    """
+    # Pipeline de classificação (espera o aquecimento se ainda estiver em andamento)
+    with timed("model_wait"):
+        validador = get_validator_loader().get(timeout=MODEL_WAIT_TIMEOUT)
+    
+    return analyze_pages(
+        links_list,
+        validador,
+        user_interests,
+        driver_pool=get_driver_pool(),
+        cache=get_classification_cache(),
+        model=backend_id()
+    )
 
 # Interface Streamlit
 st.set_page_config(page_title="Know Your Fan", page_icon="🎮", layout="wide")
@@ -359,9 +217,11 @@ with st.form("formulario_fas"):
     
     st.subheader("Interesses em E-Sports")
     interesses_salvos = st.session_state.user_data.get("Interesses", "").split(", ") if st.session_state.user_data.get("Interesses") else []
+    opcoes_interesses = get_vocabulary().names("organizacao") + get_vocabulary().names("jogo")
     interesses = st.multiselect("Quais equipes ou jogos você mais acompanha?", 
-                              options=ORGANIZACOES_ESPORTS + JOGOS_ESPORTS,
-                              default=interesses_salvos,
+                              options=opcoes_interesses,
+                              # O vocabulário pode ter mudado desde que os dados foram salvos
+                              default=[i for i in interesses_salvos if i in opcoes_interesses],
                               key="interesses_input")
     
     st.subheader("Atividades Recentes")
@@ -397,9 +257,8 @@ with st.form("formulario_fas"):
                 "Twitter_Usuario": username
             })
             
-            # Salva em JSON (opcional)
-            with open("user_data.json", "w") as f:
-                json.dump(st.session_state.user_data, f)
+            # Upsert pelo CPF: envios simultâneos não se sobrescrevem e o histórico é mantido
+            get_registry().upsert(st.session_state.user_data)
             
             st.success("Dados salvos com sucesso!")
             st.write("Dados salvos:", st.session_state.user_data)  # Para debug
@@ -407,24 +266,22 @@ with st.form("formulario_fas"):
 # Validação de Identidade
 with st.expander("🆔 Validação de Identidade", expanded=False):
     uploaded_file = st.file_uploader("Documento de identidade (RG, CNH, Passaporte)", 
-                                   type=["png", "jpg", "jpeg"])
+                                   type=["png", "jpg", "jpeg", "pdf"])
     
     if uploaded_file and uploaded_file.size > 0:
         if uploaded_file.size > MAX_FILE_SIZE:
             st.error(f"Arquivo muito grande. Tamanho máximo permitido: {MAX_FILE_SIZE/1024/1024}MB")
         else:
-            with st.spinner("Processando documento..."):
-                texto_extraido = process_document(uploaded_file)
-                if texto_extraido:
-                    st.text_area("Texto extraído (OCR)", texto_extraido, height=200)
-                    
-                    # Verifica correspondência de CPF
-                    if 'CPF' in st.session_state.user_data:
-                        cpfs_doc = re.findall(r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}', texto_extraido)
-                        if cpfs_doc and st.session_state.user_data['CPF'] in ''.join(filter(str.isdigit, cpfs_doc[0])):
-                            st.success("CPF do documento corresponde ao informado!")
-                        else:
-                            st.warning("CPF não encontrado ou não corresponde ao informado")
+            # Um job por upload: reruns só consultam o handle, sem reenviar o arquivo
+            if st.session_state.get("ocr_upload") != uploaded_file.file_id:
+                st.session_state.ocr_job = process_document(uploaded_file)
+                st.session_state.ocr_upload = uploaded_file.file_id if st.session_state.ocr_job else None
+            job = st.session_state.get("ocr_job")
+            if job is not None:
+                if job.done():
+                    show_document_result(job)
+                else:
+                    wait_document(job)
 
 # Análise de Redes Sociais
 st.header("📱 Análise de Redes Sociais")
@@ -438,62 +295,53 @@ with tab_twitter:
                 twitter_data = analyze_twitter_profile(st.session_state.user_data["Twitter_Usuario"])
                 
                 if twitter_data:
+                    import pandas as pd
+                    
                     st.session_state.user_data["twitter_data"] = twitter_data
+                    perfil = TwitterProfile.from_dict(twitter_data)
                     
                     # Mostra métricas básicas
-                    metrics = twitter_data["user"].public_metrics
                     st.subheader("📊 Métricas do Perfil")
                     
                     cols = st.columns(4)
-                    cols[0].metric("Seguidores", metrics["followers_count"])
-                    cols[1].metric("Seguindo", metrics["following_count"])
-                    cols[2].metric("Tweets", metrics["tweet_count"])
-                    cols[3].metric("Listas", metrics["listed_count"])
+                    cols[0].metric("Seguidores", perfil.user.followers_count)
+                    cols[1].metric("Seguindo", perfil.user.following_count)
+                    cols[2].metric("Tweets", perfil.user.tweet_count)
+                    cols[3].metric("Listas", perfil.user.listed_count)
                     
-                    # Análise de tweets
+                    # Análise de tweets (a coleta já guarda só os de e-sports, por engajamento)
                     st.subheader("🎮 Tweets sobre E-Sports")
-                    if twitter_data["tweets"]:
-                        tweets_esports = []
-                        for tweet in twitter_data["tweets"]:
-                            if any(org in tweet.text.lower() for org in ORGANIZACOES_ESPORTS) or \
-                               any(game in tweet.text.lower() for game in JOGOS_ESPORTS):
-                                engagement = tweet.public_metrics["like_count"] + tweet.public_metrics["retweet_count"]
-                                tweets_esports.append({
-                                    "Tweet": tweet.text[:100] + "..." if len(tweet.text) > 100 else tweet.text,
-                                    "Data": tweet.created_at.strftime("%Y-%m-%d"),
-                                    "Engajamento": engagement
-                                })
+                    if perfil.tweets:
+                        tweets_esports = [{
+                            "Tweet": tweet.text[:100] + "..." if len(tweet.text) > 100 else tweet.text,
+                            "Data": tweet.created_at.strftime("%Y-%m-%d") if tweet.created_at else "",
+                            "Engajamento": tweet.engagement
+                        } for tweet in perfil.tweets]
                         
-                        if tweets_esports:
+                        with timed("render", view="tweets"):
                             df = pd.DataFrame(tweets_esports).sort_values("Engajamento", ascending=False)
                             st.dataframe(df, use_container_width=True)
-                            
-                            engajamento_total = df["Engajamento"].sum()
-                            st.metric("Total de Engajamento em E-Sports", engajamento_total)
-                        else:
-                            st.info("Nenhum tweet sobre e-sports encontrado nos últimos tweets.")
+                        
+                        st.metric("Total de Engajamento em E-Sports", perfil.metrics.get("engagement", df["Engajamento"].sum()))
+                    else:
+                        st.info("Nenhum tweet sobre e-sports encontrado nos últimos tweets.")
                     
-                    # Análise de contas seguidas
+                    # Análise de contas seguidas (a coleta já guarda só as organizações)
                     st.subheader("🏆 Organizações Seguidas")
-                    if twitter_data["following"]:
-                        orgs_seguidas = []
-                        for user in twitter_data["following"]:
-                            desc = user.description.lower() if user.description else ""
-                            if any(org in desc or org in user.username.lower() for org in ORGANIZACOES_ESPORTS):
-                                orgs_seguidas.append({
-                                    "Organização": user.name,
-                                    "Username": f"@{user.username}",
-                                    "Seguidores": user.public_metrics["followers_count"] if hasattr(user, 'public_metrics') else "N/A"
-                                })
+                    if perfil.following:
+                        orgs_seguidas = [{
+                            "Organização": user.name,
+                            "Username": f"@{user.username}",
+                            "Seguidores": user.followers_count if user.followers_count is not None else "N/A"
+                        } for user in perfil.following]
                         
-                        if orgs_seguidas:
-                            df_orgs = pd.DataFrame(orgs_seguidas)
-                            st.dataframe(df_orgs, use_container_width=True)
-                            
-                            top_org = df_orgs.sort_values("Seguidores", ascending=False).iloc[0]
-                            st.success(f"Você segue {len(orgs_seguidas)} organizações de e-sports! A maior é {top_org['Organização']} com {top_org['Seguidores']} seguidores.")
-                        else:
-                            st.info("Nenhuma organização de e-sports encontrada entre as contas seguidas.")
+                        df_orgs = pd.DataFrame(orgs_seguidas)
+                        st.dataframe(df_orgs, use_container_width=True)
+                        
+                        top_org = max(perfil.following, key=lambda user: user.followers_count or 0)
+                        st.success(f"Você segue {len(orgs_seguidas)} organizações de e-sports! A maior é {top_org.name} com {top_org.followers_count} seguidores.")
+                    elif perfil.metrics.get("following_analyzed"):
+                        st.info("Nenhuma organização de e-sports encontrada entre as contas seguidas.")
     else:
         st.warning("Por favor, insira um nome de usuário do Twitter e salve os dados primeiro")
 
@@ -522,9 +370,20 @@ with tab_other:
 
 # Validação de Links
 with st.expander("🔗 Validação de Links de E-Sports", expanded=False):
+    status_modelo = get_validator_loader().status()
+    if status_modelo["status"] == "ready":
+        st.caption(f"✅ Modelo de classificação pronto ({status_modelo['load_seconds']:.1f}s para carregar)")
+    elif status_modelo["status"] == "error":
+        st.error(f"Modelo de classificação indisponível: {status_modelo['error']}")
+    else:
+        st.info("⏳ Modelo de classificação carregando em segundo plano. A validação começará assim que ele estiver pronto.")
+    
     links = st.text_area("Cole links de perfis ou páginas relacionados a e-sports (um por linha)", height=100)
     
-    if st.button("Validar Links"):
+    if st.session_state.pop("links_cancelados", False):
+        st.info("Análise de links cancelada")
+    
+    if st.button("Validar Links", disabled=status_modelo["status"] == "error"):
         if not links:
             st.warning("Por favor, insira pelo menos um link")
         else:
@@ -535,47 +394,99 @@ with st.expander("🔗 Validação de Links de E-Sports", expanded=False):
             if 'Interesses' in st.session_state.user_data:
                 user_interests = [i.strip().lower() for i in st.session_state.user_data['Interesses'].split(",")]
             
-            with st.spinner("Analisando links..."):
-                resultados = analyze_links(links_list, user_interests)
-                
-                st.subheader("📋 Resultados da Validação")
-                
-                # Ordena por relevância e pontuação
-                df_resultados = pd.DataFrame(resultados).sort_values(
-                    ["Relevância", "Pontuação"], 
-                    ascending=[False, False]
-                )
-                
-                # Formatação condicional
-                def color_relevance(val):
-                    if val == "Alta":
-                        return 'background-color: #4CAF50; color: white'
-                    elif val == "Média":
-                        return 'background-color: #FFC107; color: black'
-                    elif val == "Baixa":
-                        return 'background-color: #F44336; color: white'
-                    else:
-                        return ''
-                
-                styled_df = df_resultados.style.applymap(color_relevance, subset=['Relevância'])
-                st.dataframe(styled_df, use_container_width=True, hide_index=True)
+            try:
+                with st.spinner("Carregando o modelo de classificação..."):
+                    linhas = analyze_links(links_list, user_interests)
+            except TimeoutError:
+                st.warning("⏳ O modelo de classificação ainda está carregando. Tente validar os links novamente em instantes.")
+                linhas = None
+            except Exception as e:
+                # O aquecimento pode ter falhado depois que a página foi montada
+                st.error(f"Modelo de classificação indisponível: {e}")
+                linhas = None
+            
+            if linhas is not None:
+                import pandas as pd
                 
-                # Estatísticas
-                high_relevance = sum(1 for r in resultados if r["Relevância"] == "Alta")
-                medium_relevance = sum(1 for r in resultados if r["Relevância"] == "Média")
+                # Clicar em Cancelar interrompe esta execução; fechar o gerador cancela as buscas pendentes
+                cancelar = st.empty()
+                cancelar.button("Cancelar", on_click=lambda: st.session_state.update(links_cancelados=True))
                 
+                st.subheader("📋 Resultados da Validação")
+                progresso = st.progress(0.0, text="Buscando as páginas...")
                 col1, col2 = st.columns(2)
-                col1.metric("Links Altamente Relevantes", high_relevance)
-                col2.metric("Links Medianamente Relevantes", medium_relevance)
+                contador_alta, contador_media = col1.empty(), col2.empty()
+                tabela = st.empty()
                 
-                # Mostra recomendações baseadas nos melhores links
-                if high_relevance > 0:
-                    best_links = [r for r in resultados if r["Relevância"] == "Alta"]
-                    st.success("🔍 Recomendações baseadas nos links mais relevantes:")
+                # Cada linha aparece assim que o link é pontuado; a tabela e os contadores crescem junto
+                resultados = []
+                high_relevance = medium_relevance = 0
+                inicio = time.perf_counter()
+                atualizado_em = 0.0
+                try:
+                    with timed("analyze_links"):
+                        for linha in linhas:
+                            if not resultados:
+                                observe("links_first_result", time.perf_counter() - inicio)
+                            resultados.append(linha)
+                            high_relevance += linha["Relevância"] == "Alta"
+                            medium_relevance += linha["Relevância"] == "Média"
+                            if time.perf_counter() - atualizado_em >= LIVE_TABLE_INTERVAL or len(resultados) == len(links_list):
+                                atualizado_em = time.perf_counter()
+                                progresso.progress(len(resultados) / len(links_list),
+                                                   text=f"{len(resultados)}/{len(links_list)} links analisados")
+                                contador_alta.metric("Links Altamente Relevantes", high_relevance)
+                                contador_media.metric("Links Medianamente Relevantes", medium_relevance)
+                                with timed("render", view="links_live"):
+                                    tabela.dataframe(pd.DataFrame(resultados), use_container_width=True, hide_index=True)
+                finally:
+                    linhas.close()
+                progresso.empty()
+                cancelar.empty()
+                
+                if resultados:
+                    # Ordena por relevância e pontuação
+                    df_resultados = pd.DataFrame(resultados).sort_values(
+                        ["Relevância", "Pontuação"], 
+                        ascending=[False, False]
+                    )
+                    
+                    # Formatação condicional
+                    def color_relevance(val):
+                        if val == "Alta":
+                            return 'background-color: #4CAF50; color: white'
+                        elif val == "Média":
+                            return 'background-color: #FFC107; color: black'
+                        elif val == "Baixa":
+                            return 'background-color: #F44336; color: white'
+                        else:
+                            return ''
                     
-                    for link in best_links[:3]:  # Mostra até 3 recomendações
-                        terms = link["Termos Encontrados"] + (" | " + link["Interesses do Usuário"] if link["Interesses do Usuário"] else "")
-                        st.write(f"- [{link['Link']}]({link['Link']}) - {terms}")
+                    # Tabela final, ordenada e colorida, no lugar da parcial
+                    with timed("render", view="links"):
+                        styled_df = df_resultados.style.map(color_relevance, subset=['Relevância'])
+                        tabela.dataframe(styled_df, use_container_width=True, hide_index=True)
+                    contador_alta.metric("Links Altamente Relevantes", high_relevance)
+                    contador_media.metric("Links Medianamente Relevantes", medium_relevance)
+                    
+                    # Ocupação do pool de navegadores
+                    pool_stats = get_driver_pool().stats()
+                    cache_stats = get_classification_cache().stats()
+                    st.caption(
+                        f"Navegadores em uso: {pool_stats['in_use']}/{pool_stats['max_size']} · "
+                        f"Espera média: {pool_stats['wait_seconds_avg']:.2f}s · "
+                        f"Espera máxima: {pool_stats['wait_seconds_max']:.2f}s · "
+                        f"Cache de classificação: {cache_stats['hit_ratio']*100:.0f}% de acertos"
+                    )
+                    
+                    # Mostra recomendações baseadas nos melhores links
+                    if high_relevance > 0:
+                        best_links = [r for r in resultados if r["Relevância"] == "Alta"]
+                        st.success("🔍 Recomendações baseadas nos links mais relevantes:")
+                        
+                        for link in best_links[:3]:  # Mostra até 3 recomendações
+                            terms = link["Termos Encontrados"] + (" | " + link["Interesses do Usuário"] if link["Interesses do Usuário"] else "")
+                            st.write(f"- [{link['Link']}]({link['Link']}) - {terms}")
 
 # Perfil Completo
 if st.button("Gerar Perfil Completo", type="primary"):
@@ -583,7 +494,8 @@ if st.button("Gerar Perfil Completo", type="primary"):
         st.error("Por favor, preencha seus dados pessoais e clique em 'Salvar Meus Dados' primeiro")
     else:
         with st.spinner("Gerando seu perfil de fã..."):
-            profile = generate_fan_profile(st.session_state.user_data)
+            with timed("fan_profile"):
+                profile = generate_fan_profile(st.session_state.user_data)
             
             st.header(f"🎮 Perfil de Fã: {profile['basic_info']['name']}")
             
@@ -631,4 +543,16 @@ if st.button("Gerar Perfil Completo", type="primary"):
                     cols[i].image(f"https://via.placeholder.com/100/4CAF50/FFFFFF?text={badge.replace(' ', '+')}", 
                                 caption=badge, width=100)
             else:
-                st.info("Complete mais informações para desbloquear conquistas")
\ No newline at end of file
+                st.info("Complete mais informações para desbloquear conquistas")
+
+# Painel de diagnóstico: latência por etapa e estado dos componentes compartilhados
+if DEBUG_PANEL or st.query_params.get("debug") == "1":
+    with st.expander("🛠️ Diagnóstico", expanded=False):
+        etapas = get_metrics().stages()
+        if etapas:
+            import pandas as pd
+            
+            st.dataframe(pd.DataFrame(etapas), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhuma etapa medida ainda neste processo")
+        st.json(get_metrics().components(), expanded=False)
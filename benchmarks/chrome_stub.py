@@ -0,0 +1,51 @@
+"""Stand-in local do Chrome (webdriver) que "renderiza" páginas a partir de arquivos em disco"""
+import os
+import time
+from urllib.parse import urlparse
+
+
+class StubDriver:
+    """Imita os métodos do webdriver usados por browser.py e links.py, sem navegador
+
+    `get(url)` carrega `<pages_dir>/<nome>.rendered.html` quando existe (o
+    HTML depois do JavaScript) ou `<pages_dir>/<nome>.html`; o host da URL
+    é ignorado. `render_latency` simula o tempo de carregamento da página.
+    """
+
+    def __init__(self, pages_dir, render_latency=0.0):
+        self.pages_dir = pages_dir
+        self.render_latency = render_latency
+        self.page_source = ""
+        self.pages_loaded = 0
+        self.closed = False
+
+    def set_page_load_timeout(self, timeout):
+        self.timeout = timeout
+
+    def get(self, url):
+        if self.closed:
+            raise RuntimeError("Navegador encerrado")
+        if self.render_latency:
+            time.sleep(self.render_latency)
+        nome = os.path.splitext(os.path.basename(urlparse(url).path))[0]
+        for arquivo in (f"{nome}.rendered.html", f"{nome}.html"):
+            caminho = os.path.join(self.pages_dir, arquivo)
+            if os.path.exists(caminho):
+                with open(caminho, encoding="utf-8") as f:
+                    self.page_source = f.read()
+                self.pages_loaded += 1
+                return
+        raise RuntimeError(f"Página não encontrada: {url}")
+
+    def execute_script(self, script):
+        if self.closed:
+            raise RuntimeError("Navegador encerrado")
+        return "complete" if "readyState" in script else 1
+
+    def quit(self):
+        self.closed = True
+
+
+def stub_driver_factory(pages_dir, render_latency=0.0):
+    """Factory para DriverPool(factory=...) que cria StubDrivers"""
+    return lambda: StubDriver(pages_dir, render_latency)
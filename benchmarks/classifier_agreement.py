@@ -0,0 +1,49 @@
+"""Compara um backend de classificação com o baseline BART-MNLI
+
+Mede concordância da categoria principal, latência por link e memória
+carregada pelo candidato. Rode um backend por execução para que a
+medição de memória não misture modelos.
+
+Uso: python -m benchmarks.classifier_agreement --backend quantized
+"""
+import argparse
+import json
+import resource
+import time
+
+from benchmarks.corpus import TEXTOS_EXEMPLO
+from classifier import BASELINE_BACKEND, CLASSIFIER_BACKENDS, backend_id, evaluate_agreement, load_validator
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo em MB (Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", required=True, choices=sorted(CLASSIFIER_BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    # O candidato é carregado primeiro para medir sua memória isoladamente
+    memoria_inicial = peak_rss_mb()
+    inicio = time.perf_counter()
+    candidato = load_validator(args.backend)
+    carga_segundos = time.perf_counter() - inicio
+    memoria_candidato = peak_rss_mb() - memoria_inicial
+
+    baseline = load_validator(BASELINE_BACKEND)
+    relatorio = {
+        "backend": backend_id(args.backend),
+        "baseline": backend_id(BASELINE_BACKEND),
+        "textos": len(TEXTOS_EXEMPLO),
+        "carga_segundos": round(carga_segundos, 2),
+        "memoria_candidato_mb": round(memoria_candidato, 1),
+    }
+    relatorio.update(evaluate_agreement(baseline, candidato, TEXTOS_EXEMPLO, batch_size=args.batch_size))
+    print(json.dumps(relatorio, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Mede a vazão da classificação zero-shot para vários tamanhos de lote
+
+Uso: python -m benchmarks.classifier_batch_size --backend distil --links 32 --batch-sizes 1 4 8 16
+"""
+import argparse
+import json
+
+from benchmarks.corpus import corpus
+from classifier import CLASSIFIER_BACKEND, CLASSIFIER_BACKENDS, load_validator, measure_throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default=CLASSIFIER_BACKEND, choices=sorted(CLASSIFIER_BACKENDS))
+    parser.add_argument("--links", type=int, default=32, help="Quantidade de páginas classificadas por medição")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    textos = corpus(args.links)
+    validador = load_validator(args.backend)
+    for linha in measure_throughput(validador, textos, args.batch_sizes):
+        print(json.dumps(linha, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Corpus fixo de trechos de páginas usado nos benchmarks de classificação"""
+
+TEXTOS_EXEMPLO = [
+    "furia esports é uma organização brasileira de counter-strike e valorant com elenco profissional",
+    "liquipedia: tabela do campeonato de league of legends, resultados e chaveamento do torneio",
+    "canal oficial da loud na twitch com transmissões ao vivo de free fire e valorant",
+    "notícias de games: patch notes do novo mapa de rainbow six siege e mudanças no meta",
+    "sobre mim: streamer, jogo fortnite todas as noites e faço lives de dota com os amigos",
+    "loja oficial com camisas, moletons e acessórios do time campeão mundial de csgo",
+    "comunidade de fãs da navi: discussões, memes e palpites para o major de counter-strike",
+    "estúdio desenvolvedor de jogos competitivos anuncia nova temporada ranqueada",
+    "g2 esports anuncia contratação de novo suporte para o time de league of legends",
+    "vct americas: horários das partidas, transmissão oficial e premiação do torneio",
+    "perfil do jogador: estatísticas, rating, mapas favoritos e histórico de times",
+    "fórum da comunidade fnatic com encontros de fãs e sorteios de ingressos",
+    "receitas fáceis de bolo de chocolate para o fim de semana",
+    "canal no youtube com análises de partidas e jogadas de pro players de valorant",
+    "riot games divulga calendário do mundial e novidades do cliente do jogo",
+    "mibr volta ao cenário com line-up brasileira para o próximo major",
+]
+
+
+def corpus(n):
+    """Repete o corpus até ter `n` textos"""
+    return [TEXTOS_EXEMPLO[i % len(TEXTOS_EXEMPLO)] for i in range(n)]
@@ -0,0 +1,73 @@
+"""Compara generate_fan_profile (fã a fã) com o motor vetorizado score_fans
+
+Uso: python -m benchmarks.fan_scoring --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import random
+import time
+
+import pandas as pd
+
+from fan_profile import generate_fan_profile, score_fans, to_profiles
+from vocabulary import get_vocabulary
+
+MAX_CHECKED = 100000  # Acima disso a conferência usa uma amostra
+
+
+def fans(n, seed=0):
+    """Cadastros sintéticos com a mesma forma dos salvos pelo formulário"""
+    rng = random.Random(seed)
+    opcoes = get_vocabulary().names("organizacao") + get_vocabulary().names("jogo")
+    registros = []
+    for i in range(n):
+        registro = {
+            "Nome": f"Fã {i}",
+            "Email": f"fa{i}@exemplo.com",
+            "Twitter_Usuario": f"fa{i}" if rng.random() < 0.7 else "",
+            "Eventos_Participados": ", ".join(f"evento {j}" for j in range(rng.choice([0, 0, 1, 2, 4]))),
+            "Compras_Realizadas": ", ".join(f"compra {j}" for j in range(rng.choice([0, 1, 3]))),
+        }
+        if rng.random() < 0.9:
+            registro["Interesses"] = ", ".join(rng.sample(opcoes, rng.randint(0, 5)))
+        if rng.random() < 0.5:
+            metricas = {"tweets_esports": rng.randint(0, 30), "engagement": rng.randint(0, 5000)}
+            if rng.random() < 0.8:
+                metricas["orgs_followed"] = rng.randint(0, 8)
+            registro["twitter_data"] = {"metrics": metricas}
+        registros.append(registro)
+    return registros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        registros = fans(n)
+        tabela = pd.DataFrame(registros)
+
+        inicio = time.perf_counter()
+        esperado = [generate_fan_profile(r) for r in registros]
+        por_registro = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resultado = score_fans(tabela)
+        vetorizado = time.perf_counter() - inicio
+
+        amostra = range(0, n, max(1, n // MAX_CHECKED))
+        obtido = to_profiles(resultado.iloc[list(amostra)])
+        identico = all(obtido[j] == esperado[i] for j, i in enumerate(amostra))
+
+        print(json.dumps({
+            "rows": n,
+            "per_record_seconds": round(por_registro, 3),
+            "vectorized_seconds": round(vetorizado, 3),
+            "speedup": round(por_registro / vetorizado, 2),
+            "identical": identico,
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Documentos de identidade sintéticos (com CPF conhecido) usados nos benchmarks de OCR"""
+import io
+import random
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+# Só ASCII: a fonte padrão do Pillow não tem acentos
+CAMPOS = [
+    ("NOME", "MARIA DA SILVA SANTOS"),
+    ("DATA DE NASCIMENTO", "12/03/1998"),
+    ("FILIACAO", "JOSE DOS SANTOS / ANA DA SILVA"),
+    ("NATURALIDADE", "SAO PAULO - SP"),
+    ("REGISTRO GERAL", "12.345.678-9"),
+]
+
+
+def random_cpf(rng):
+    """CPF válido aleatório, formatado"""
+    digitos = [rng.randint(0, 9) for _ in range(9)]
+    for tamanho in (9, 10):
+        soma = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos))
+        resto = 11 - soma % 11
+        digitos.append(resto if resto < 10 else 0)
+    d = "".join(map(str, digitos))
+    return f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}"
+
+
+def _card(cpf, largura, rng):
+    """Frente de um RG simplificado, com o CPF entre outros campos"""
+    altura = int(largura * 0.63)
+    card = Image.new("RGB", (largura, altura), (226, 232, 220))
+    draw = ImageDraw.Draw(card)
+    titulo = ImageFont.load_default(size=largura // 28)
+    fonte = ImageFont.load_default(size=largura // 36)
+    draw.text((largura * 0.05, altura * 0.05), "REPUBLICA FEDERATIVA DO BRASIL", fill=(30, 40, 30), font=titulo)
+    y = altura * 0.2
+    campos = CAMPOS[:]
+    campos.insert(rng.randint(1, len(campos)), ("CPF", cpf))
+    for rotulo, valor in campos:
+        draw.text((largura * 0.05, y), rotulo, fill=(90, 90, 90), font=fonte)
+        draw.text((largura * 0.05, y + largura / 30), valor, fill=(15, 15, 15), font=fonte)
+        y += largura / 14
+    return card
+
+
+def photo(cpf, rng):
+    """Foto de celular: documento sobre uma mesa, JPEG grande e girado via EXIF"""
+    fundo = Image.new("RGB", (4032, 3024), tuple(rng.randint(20, 70) for _ in range(3)))
+    card = _card(cpf, rng.randint(2200, 2800), rng)
+    fundo.paste(card.rotate(rng.uniform(-2, 2), expand=True, fillcolor=fundo.getpixel((0, 0))),
+                (rng.randint(200, 900), rng.randint(200, 700)))
+    fundo = fundo.filter(ImageFilter.GaussianBlur(1))
+    exif = Image.Exif()
+    orientacao = rng.choice([1, 6, 8])
+    if orientacao != 1:
+        # Gravada como o sensor viu; a tag EXIF diz como desvirar
+        fundo = fundo.rotate(90 if orientacao == 6 else -90, expand=True)
+    exif[0x0112] = orientacao
+    buffer = io.BytesIO()
+    fundo.save(buffer, "JPEG", quality=88, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def scan(cpf, rng):
+    """Scan em 600 DPI, em PNG, sem fundo ao redor"""
+    card = _card(cpf, 2040, rng)
+    buffer = io.BytesIO()
+    card.save(buffer, "PNG", dpi=(600, 600))
+    return buffer.getvalue()
+
+
+def sample_documents(n, seed=0):
+    """[(bytes da imagem, CPF esperado, tipo)] alternando fotos e scans"""
+    rng = random.Random(seed)
+    amostras = []
+    for i in range(n):
+        cpf = random_cpf(rng)
+        tipo = "photo" if i % 2 == 0 else "scan"
+        amostras.append(((photo if tipo == "photo" else scan)(cpf, rng), cpf, tipo))
+    return amostras
@@ -0,0 +1,52 @@
+"""Latência e acerto do CPF no OCR de documentos, com e sem pré-processamento, nos modos cpf e full
+
+Uso: python -m benchmarks.ocr_preprocessing --documents 10 --modes cpf full
+Requer o Tesseract instalado (TESSERACT_CMD ou no PATH).
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import pytesseract
+
+from benchmarks.id_samples import sample_documents
+from benchmarks.offline_suite import percentiles
+from ocr import extract_document_text
+
+
+def measure(amostras, preprocessed, mode):
+    latencias, acertos = [], 0
+    for data, cpf, _ in amostras:
+        inicio = time.perf_counter()
+        resultado, _ = extract_document_text(data, preprocessed=preprocessed, mode=mode)
+        latencias.append(time.perf_counter() - inicio)
+        acertos += resultado["cpf"] == cpf
+    return {
+        "mode": mode,
+        "preprocessed": preprocessed,
+        "documents": len(amostras),
+        **percentiles(latencias),
+        "latency_mean": round(statistics.fmean(latencias), 3),
+        "cpf_accuracy": round(acertos / len(amostras), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10, help="Documentos sintéticos (metade fotos, metade scans)")
+    parser.add_argument("--modes", nargs="+", default=["full", "cpf"], choices=["full", "cpf"])
+    args = parser.parse_args()
+
+    if os.getenv("TESSERACT_CMD"):
+        pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_CMD")
+
+    amostras = sample_documents(args.documents)
+    for mode in args.modes:
+        for preprocessed in (False, True):
+            print(json.dumps(measure(amostras, preprocessed, mode)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Suíte de benchmarks offline: links, Twitter, OCR, CPF e perfil de fã sem rede, credenciais ou navegador
+
+Cada subsistema roda com stand-ins locais (páginas de benchmarks/fixtures
+servidas por HTTP em localhost, Chrome e classificador falsos, cliente do
+Twitter sintético, documentos sintéticos) em vários tamanhos de entrada.
+Cada medição roda em um processo novo, para que o pico de RSS seja só
+dela. Os resultados vão para um JSON que pode ser comparado com uma
+execução anterior via --baseline.
+
+Uso: python -m benchmarks.offline_suite --subsystems links twitter cpf --output bench.json --baseline anterior.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.classifier_agreement import peak_rss_mb
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+# Tamanhos padrão: links por análise, contas seguidas por perfil, documentos, CPFs e fãs
+DEFAULT_SIZES = {
+    "links": [5, 20, 50],
+    "twitter": [200, 1000, 5000],
+    "ocr": [4, 8],
+    "ocr_preprocess": [4, 8],
+    "cpf": [1000, 10000, 100000],
+    "fan_profile": [1000, 10000, 100000],
+}
+DEFAULT_REPEAT = 5  # Chamadas medidas por tamanho em links e twitter
+
+
+def percentiles(latencias):
+    latencias = sorted(latencias)
+    return {
+        "latency_p50": round(statistics.median(latencias), 6),
+        "latency_p95": round(latencias[math.ceil(len(latencias) * 0.95) - 1], 6),
+    }
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _FixtureServer(ThreadingHTTPServer):
+    # O backlog padrão (5) descarta conexões com FETCH_WORKERS buscas simultâneas e soma 1s de retransmissão
+    request_queue_size = 128
+
+
+def serve_fixtures(directory=PAGES_DIR):
+    """Serve as páginas de fixture em localhost; retorna (servidor, URL base)"""
+    server = _FixtureServer(("127.0.0.1", 0), partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def bench_links(size, repeat):
+    """analyze_pages de ponta a ponta: HTTP local, Chrome falso, classificador por palavras-chave"""
+    from benchmarks.chrome_stub import stub_driver_factory
+    from benchmarks.classifier_stub import KeywordClassifier
+    from browser import DriverPool
+    from links import analyze_pages
+
+    paginas = sorted(f for f in os.listdir(PAGES_DIR) if not f.endswith(".rendered.html"))
+    server, base = serve_fixtures()
+    pool = DriverPool(factory=stub_driver_factory(PAGES_DIR))
+    classificador = KeywordClassifier()
+    latencias = []
+    primeiros = []
+    erros = 0
+    try:
+        for r in range(repeat):
+            # Query string única: os links não se repetem entre rodadas
+            links = [f"{base}/{paginas[i % len(paginas)]}?r={r}&i={i}" for i in range(size)]
+            inicio = time.perf_counter()
+            resultados = []
+            for linha in analyze_pages(links, classificador, ["furia", "loud"], driver_pool=pool):
+                if not resultados:
+                    primeiros.append(time.perf_counter() - inicio)
+                resultados.append(linha)
+            latencias.append(time.perf_counter() - inicio)
+            erros += sum(1 for linha in resultados if linha["Categoria"] == "Erro")
+    finally:
+        pool.close()
+        server.shutdown()
+    return latencias, size * repeat, sum(latencias), {
+        "first_result_p50": round(statistics.median(primeiros), 6),
+        "errors": erros,
+        "chrome_checkouts": pool.stats()["checkouts"],
+    }
+
+
+def bench_twitter(size, repeat):
+    """fetch_twitter_profile com o cliente sintético, até `size` contas seguidas e tweets por perfil"""
+    from benchmarks.twitter_stub import StubTwitterClient
+    from org_accounts import org_stats
+    from twitter_analysis import fetch_twitter_profile
+
+    cliente = StubTwitterClient(max_tweets=size, max_following=size)
+    latencias = []
+    for r in range(repeat):
+        inicio = time.perf_counter()
+        perfil = fetch_twitter_profile(cliente, f"fa{r}", max_tweets=size, max_following=size)
+        perfil.to_dict()
+        latencias.append(time.perf_counter() - inicio)
+    orgs = org_stats()
+    return latencias, repeat, sum(latencias), {
+        "api_calls": sum(cliente.calls.values()),
+        "org_index_hits": orgs["index_hits"],
+        "org_fallback_ratio": round(orgs["fallback_ratio"], 3),
+    }
+
+
+def _tesseract_available():
+    import pytesseract
+
+    if os.getenv("TESSERACT_CMD"):
+        pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_CMD")
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def bench_ocr(size, repeat):
+    """Documentos sintéticos pela fila de OCR (processos), como no upload do app"""
+    from benchmarks.id_samples import sample_documents
+    from ocr import OCRQueue
+
+    if not _tesseract_available():
+        return None, 0, 0.0, {"skipped": "Tesseract não encontrado (TESSERACT_CMD ou PATH)"}
+
+    amostras = sample_documents(size)
+    fila = OCRQueue(max_pending=size)
+    try:
+        inicio = time.perf_counter()
+        jobs = [(fila.submit(data), cpf) for data, cpf, _ in amostras]
+        acertos = 0
+        latencias = []
+        for job, cpf in jobs:
+            job.future.result()
+            latencias.append(time.time() - job.submitted_at)
+            acertos += job.result()["cpf"] == cpf
+        # Os documentos são processados em paralelo: a vazão usa o tempo total, não a soma das latências
+        segundos = time.perf_counter() - inicio
+    finally:
+        fila.close()
+    return latencias, size, segundos, {"cpf_accuracy": round(acertos / size, 3)}
+
+
+def bench_ocr_preprocess(size, repeat):
+    """Decodificação e pré-processamento das imagens, sem Tesseract"""
+    from benchmarks.id_samples import sample_documents
+    from ocr import load_image
+
+    latencias = []
+    for data, _, _ in sample_documents(size):
+        inicio = time.perf_counter()
+        load_image(data, preprocessed=True)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias, size, sum(latencias), {}
+
+
+def bench_cpf(size, repeat):
+    """validate_cpf em CPFs válidos, formatados e inválidos"""
+    import random
+
+    from benchmarks.id_samples import random_cpf
+    from validators import validate_cpf
+
+    rng = random.Random(0)
+    cpfs = []
+    for i in range(size):
+        cpf = random_cpf(rng)
+        cpfs.append(cpf if i % 3 else "".join(filter(str.isdigit, cpf))[:-1] + "0")
+    latencias = []
+    for cpf in cpfs:
+        inicio = time.perf_counter()
+        validate_cpf(cpf)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias, size, sum(latencias), {}
+
+
+def bench_fan_profile(size, repeat):
+    """generate_fan_profile fã a fã sobre cadastros sintéticos"""
+    from benchmarks.fan_scoring import fans
+    from fan_profile import generate_fan_profile
+
+    latencias = []
+    for registro in fans(size):
+        inicio = time.perf_counter()
+        generate_fan_profile(registro)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias, size, sum(latencias), {}
+
+
+SUBSYSTEMS = {
+    "links": bench_links,
+    "twitter": bench_twitter,
+    "ocr": bench_ocr,
+    "ocr_preprocess": bench_ocr_preprocess,
+    "cpf": bench_cpf,
+    "fan_profile": bench_fan_profile,
+}
+
+
+def run_one(subsystem, size, repeat):
+    """Uma medição; roda em um processo próprio
+
+    Cada subsistema retorna (latências, unidades processadas, segundos
+    medidos, extras); preparação de dados e stand-ins fica fora da medição.
+    """
+    latencias, unidades, segundos, extra = SUBSYSTEMS[subsystem](size, repeat)
+    linha = {"subsystem": subsystem, "size": size}
+    if latencias:
+        linha.update({
+            "units": unidades,
+            "seconds": round(segundos, 3),
+            "throughput_per_s": round(unidades / segundos, 1),
+            **percentiles(latencias),
+        })
+        linha["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    linha.update(extra)
+    return linha
+
+
+def compare(linhas, baseline):
+    """Razão entre esta execução e a anterior (p50 e vazão) para cada subsistema e tamanho"""
+    anteriores = {(l["subsystem"], l["size"]): l for l in baseline["results"]}
+    comparacao = []
+    for linha in linhas:
+        anterior = anteriores.get((linha["subsystem"], linha["size"]))
+        if not anterior or "latency_p50" not in linha or "latency_p50" not in anterior:
+            continue
+        comparacao.append({
+            "subsystem": linha["subsystem"],
+            "size": linha["size"],
+            "p50_ratio": round(linha["latency_p50"] / anterior["latency_p50"], 3) if anterior["latency_p50"] else None,
+            "throughput_ratio": round(linha["throughput_per_s"] / anterior["throughput_per_s"], 3),
+            "peak_rss_delta_mb": round(linha["peak_rss_mb"] - anterior["peak_rss_mb"], 1),
+        })
+    return comparacao
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(PAGES_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subsystems", nargs="+", default=list(SUBSYSTEMS), choices=list(SUBSYSTEMS))
+    parser.add_argument("--sizes", type=int, nargs="+", help="Mesmos tamanhos para todos os subsistemas escolhidos")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Resultados de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    linhas = []
+    contexto = multiprocessing.get_context("spawn")
+    for subsystem in args.subsystems:
+        for size in args.sizes or DEFAULT_SIZES[subsystem]:
+            # Processo novo por medição: o pico de RSS não herda o das anteriores
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                linha = executor.submit(run_one, subsystem, size, args.repeat).result()
+            print(json.dumps(linha, ensure_ascii=False))
+            linhas.append(linha)
+
+    resultado = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": linhas,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            resultado["comparison"] = compare(linhas, json.load(f))
+        for linha in resultado["comparison"]:
+            print(json.dumps(linha, ensure_ascii=False))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Stand-in local de um servidor Redis (só os comandos usados pelo cache do app)"""
+import threading
+import time
+
+
+class FakeRedis:
+    """Dicionário com expiração que implementa get, set (ex/nx), delete e eval como o redis-py
+
+    Uma mesma instância compartilhada entre threads simula várias réplicas
+    apontando para o mesmo servidor.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self.commands = 0
+
+    def _alive(self, chave):
+        item = self._data.get(chave)
+        if item and item[1] is not None and item[1] <= time.time():
+            del self._data[chave]
+            return None
+        return item
+
+    def get(self, chave):
+        with self._lock:
+            self.commands += 1
+            item = self._alive(chave)
+            return item[0] if item else None
+
+    def set(self, chave, valor, ex=None, nx=False):
+        with self._lock:
+            self.commands += 1
+            if nx and self._alive(chave):
+                return None
+            self._data[chave] = (valor, time.time() + ex if ex else None)
+            return True
+
+    def eval(self, script, numkeys, *args):
+        """Só o script de twitter_cache: apaga KEYS[1] se o valor for ARGV[1]"""
+        chave, valor = args[0], args[numkeys]
+        with self._lock:
+            self.commands += 1
+            item = self._alive(chave)
+            if item and item[0] == valor:
+                del self._data[chave]
+                return 1
+            return 0
+
+    def delete(self, *chaves):
+        with self._lock:
+            self.commands += 1
+            return sum(1 for chave in chaves if self._data.pop(chave, None) is not None)
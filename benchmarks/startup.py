@@ -0,0 +1,82 @@
+"""Tempo de inicialização do app: importações feitas pelo app.py, primeira execução e reruns
+
+Roda o app.py com o AppTest do Streamlit em um processo novo com
+`python -X importtime`, separa as importações feitas pelo script das
+feitas pelo próprio Streamlit e lista as mais caras.
+
+Uso: python -m benchmarks.startup --reruns 5 --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+MARKER = "-- app.py --"
+
+# Executado no processo medido: o marcador separa as importações do harness das do app
+_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout={timeout})
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+inicio = time.perf_counter()
+at.run()
+cold = time.perf_counter() - inicio
+reruns = []
+for _ in range({reruns}):
+    inicio = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - inicio)
+print(json.dumps({{"cold_run_seconds": cold, "rerun_seconds": reruns,
+                   "exceptions": [e.message for e in at.exception]}}))
+"""
+
+
+def parse_importtime(stderr):
+    """[(módulo, tempo acumulado em s)] das importações de primeiro nível feitas depois do marcador"""
+    linhas = stderr.splitlines()
+    if MARKER in linhas:
+        linhas = linhas[linhas.index(MARKER) + 1:]
+    importacoes = []
+    for linha in linhas:
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, acumulado, nome = linha.split("|", 2)
+        # Só o primeiro nível: os submódulos já estão no tempo acumulado do pai
+        if nome.startswith(" ") and not nome.startswith("  "):
+            try:
+                importacoes.append((nome.strip(), int(acumulado) / 1e6))
+            except ValueError:
+                continue  # Cabeçalho
+    return importacoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Importações mais caras listadas")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    script = _SCRIPT.format(app=APP_PATH, timeout=args.timeout, marker=MARKER, reruns=args.reruns)
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP_PATH), check=True)
+    medicao = json.loads(processo.stdout.strip().splitlines()[-1])
+    importacoes = parse_importtime(processo.stderr)
+
+    reruns = sorted(medicao["rerun_seconds"])
+    print(json.dumps({
+        "cold_run_seconds": round(medicao["cold_run_seconds"], 3),
+        "rerun_seconds_median": round(reruns[len(reruns) // 2], 4) if reruns else None,
+        "app_import_seconds": round(sum(t for _, t in importacoes), 3),
+        "exceptions": medicao["exceptions"],
+    }))
+    for modulo, segundos in sorted(importacoes, key=lambda item: -item[1])[:args.top]:
+        print(json.dumps({"module": modulo, "import_seconds": round(segundos, 4)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Stand-in local da API v2 do Twitter (tweepy.Client) com dados sintéticos e rate limit"""
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import requests
+import tweepy
+
+ORG_ACCOUNTS = [
+    ("FURIA", "FURIA Esports", "Organização brasileira de esports. CS2, Valorant, LoL."),
+    ("LOUDgg", "LOUD", "Somos LOUD. Free Fire, Valorant, League of Legends."),
+    ("MIBR", "MIBR", "Made in Brazil. Counter-Strike desde 2003."),
+    ("G2esports", "G2 Esports", "European esports organization."),
+    ("FNATIC", "FNATIC", "Esports organization. League of Legends, Valorant."),
+    ("natusvincere", "NAVI", "Natus Vincere official account."),
+    ("TeamLiquid", "Team Liquid", "Pro gaming organization."),
+    ("paiNgamingBR", "paiN Gaming", "A maior do Brasil. pain gaming desde 2010."),
+]
+TWEET_TEMPLATES = [
+    "Que jogo da {org} ontem no {game}!",
+    "Assistindo o campeonato de {game} hoje à noite",
+    "Bom dia, alguém recomenda um café perto da paulista?",
+    "Nova skin no {game} ficou incrível",
+    "Vai {org}! Rumo ao título",
+    "Fim de semana de churrasco com a família",
+]
+GAMES = ["valorant", "cs2", "league of legends", "dota 2", "fortnite", "rainbow six"]
+ORGS = ["furia", "loud", "mibr", "navi", "fnatic", "g2"]
+
+
+def _http_response(status_code, limit, remaining, reset_in):
+    """Resposta HTTP com os cabeçalhos x-rate-limit-* que a API real envia"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update({
+        "x-rate-limit-limit": str(limit),
+        "x-rate-limit-remaining": str(remaining),
+        "x-rate-limit-reset": str(int(time.time() + reset_in)),
+    })
+    return response
+
+
+def _rate_limited_response(limit, reset_in):
+    """Resposta HTTP 429 com os cabeçalhos que a API real envia"""
+    response = _http_response(429, limit, 0, reset_in)
+    response.headers["retry-after"] = str(max(1, math.ceil(reset_in)))
+    response.reason = "Too Many Requests"
+    response._content = b'{"title": "Too Many Requests"}'
+    return response
+
+
+class StubTwitterClient:
+    """Imita os métodos do tweepy.Client usados pelo app, sem rede
+
+    Qualquer username existe, exceto os que começam com "missing". O
+    número de tweets e de contas seguidas de cada usuário é determinístico
+    (derivado do username) e limitado por `max_tweets`/`max_following`.
+    Com `rate_limits` ({endpoint: (limite, janela_s)}) as chamadas acima da
+    cota levantam tweepy.errors.TooManyRequests, como a API real, e as
+    chamadas bem-sucedidas passam a resposta HTTP (com os cabeçalhos da
+    cota) aos hooks de `session`, como o tweepy.Client faz via requests.
+    `latency` simula o tempo de rede de cada chamada.
+    """
+
+    def __init__(self, max_tweets=200, max_following=500, rate_limits=None, latency=0.0, seed=0):
+        self.max_tweets = max_tweets
+        self.max_following = max_following
+        self.rate_limits = rate_limits or {}
+        self.latency = latency
+        self.seed = seed
+        self.calls = {}
+        self._windows = {}
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self._base_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        # Contas seguidas vêm de um universo comum, como na vida real
+        self._accounts = [
+            {"id": str(1000 + i), "username": u, "name": n, "description": d,
+             "public_metrics": {"followers_count": 1_000_000 - i * 1000}}
+            for i, (u, n, d) in enumerate(ORG_ACCOUNTS)
+        ] + [
+            {"id": str(5000 + i), "username": f"pessoa{i}", "name": f"Pessoa {i}",
+             "description": "Fã de games" if i % 3 == 0 else "Vida, café e música",
+             "public_metrics": {"followers_count": 100 + i}}
+            for i in range(2000)
+        ]
+
+    def _rng(self, key):
+        return random.Random(zlib.crc32(f"{self.seed}:{key}".encode()))
+
+    def _hit(self, endpoint):
+        """Contabiliza a chamada e aplica o rate limit simulado"""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if endpoint not in self.rate_limits:
+                return
+            limite, janela = self.rate_limits[endpoint]
+            agora = time.monotonic()
+            inicio, usados = self._windows.get(endpoint, (agora, 0))
+            if agora - inicio >= janela:
+                inicio, usados = agora, 0
+            if usados >= limite:
+                raise tweepy.errors.TooManyRequests(_rate_limited_response(limite, janela - (agora - inicio)))
+            self._windows[endpoint] = (inicio, usados + 1)
+        resposta = _http_response(200, limite, limite - usados - 1, janela - (agora - inicio))
+        requests.hooks.dispatch_hook("response", self.session.hooks, resposta)
+
+    def _user(self, username):
+        rng = self._rng(username)
+        return {
+            "id": str(10_000_000 + zlib.crc32(username.lower().encode()) % 10_000_000),
+            "username": username,
+            "name": username.title(),
+            "description": "Fã de e-sports",
+            "profile_image_url": "",
+            "public_metrics": {
+                "followers_count": rng.randint(0, 5000),
+                "following_count": rng.randint(0, self.max_following),
+                "tweet_count": rng.randint(0, self.max_tweets),
+                "listed_count": rng.randint(0, 10),
+            },
+        }
+
+    def get_user(self, username, user_fields=None, **kwargs):
+        self._hit("get_user")
+        if username.lower().startswith("missing"):
+            return tweepy.Response(None, {}, [{"title": "Not Found Error"}], {})
+        return tweepy.Response(tweepy.User(self._user(username)), {}, [], {})
+
+    def get_users(self, usernames=None, user_fields=None, **kwargs):
+        self._hit("get_users")
+        if len(usernames) > 100:
+            raise tweepy.errors.BadRequest(requests.Response())
+        users = [tweepy.User(self._user(u)) for u in usernames if not u.lower().startswith("missing")]
+        return tweepy.Response(users or None, {}, [], {})
+
+    def _page(self, items, max_results, pagination_token):
+        inicio = int(pagination_token or 0)
+        fim = inicio + (max_results or 10)
+        meta = {"result_count": len(items[inicio:fim])}
+        if fim < len(items):
+            meta["next_token"] = str(fim)
+        return items[inicio:fim], meta
+
+    def _tweets(self, user_id):
+        rng = self._rng(f"tweets:{user_id}")
+        total = rng.randint(0, self.max_tweets)
+        return [
+            {
+                "id": f"{user_id}{i:06d}",
+                "text": rng.choice(TWEET_TEMPLATES).format(org=rng.choice(ORGS), game=rng.choice(GAMES)),
+                "created_at": (self._base_date + timedelta(hours=i * 7)).isoformat().replace("+00:00", ".000Z"),
+                "public_metrics": {"like_count": rng.randint(0, 50), "retweet_count": rng.randint(0, 10),
+                                   "reply_count": 0, "quote_count": 0},
+                "edit_history_tweet_ids": [f"{user_id}{i:06d}"],
+            }
+            for i in range(total)
+        ]
+
+    def get_users_tweets(self, id, max_results=10, pagination_token=None, **kwargs):
+        self._hit("get_users_tweets")
+        itens, meta = self._page(self._tweets(id), max_results, pagination_token)
+        return tweepy.Response([tweepy.Tweet(t) for t in itens] or None, {}, [], meta)
+
+    def _following(self, user_id):
+        rng = self._rng(f"following:{user_id}")
+        total = rng.randint(0, self.max_following)
+        return rng.sample(self._accounts, min(total, len(self._accounts)))
+
+    def get_users_following(self, id, max_results=100, pagination_token=None, **kwargs):
+        self._hit("get_users_following")
+        itens, meta = self._page(self._following(id), max_results, pagination_token)
+        return tweepy.Response([tweepy.User(u) for u in itens] or None, {}, [], meta)
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Configurações do pool de navegadores
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "3"))
+DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", "50"))  # Recicla o Chrome depois de N páginas
+DRIVER_ACQUIRE_TIMEOUT = float(os.getenv("DRIVER_ACQUIRE_TIMEOUT", "30"))
+
+
+@lru_cache(maxsize=1)
+def resolve_driver_path():
+    """Resolve o caminho do chromedriver uma única vez por processo"""
+    path = os.getenv("CHROMEDRIVER_PATH")
+    if path:
+        return path
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def chrome_options():
+    """Opções padrão do Chrome headless"""
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return options
+
+
+def create_driver():
+    """Cria um Chrome headless usando o driver já resolvido"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    return webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options())
+
+
+class DriverPool:
+    """Pool de navegadores reutilizáveis com empréstimo e devolução"""
+
+    def __init__(self, max_size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES,
+                 acquire_timeout=DRIVER_ACQUIRE_TIMEOUT, factory=create_driver):
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self.factory = factory
+        self._idle = []  # Lista de (driver, páginas carregadas)
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    @staticmethod
+    def is_healthy(driver):
+        """Verifica se o navegador ainda responde"""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _acquire(self, timeout):
+        inicio = time.monotonic()
+        prazo = inicio + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool de navegadores encerrado")
+                if self._idle:
+                    driver, pages = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    driver, pages = None, 0
+                    break
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    raise TimeoutError("Nenhum navegador disponível no pool")
+                self._cond.wait(restante)
+
+            espera = time.monotonic() - inicio
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds_total"] += espera
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], espera)
+
+        # Criação e verificação de saúde ficam fora do lock
+        if driver is not None and not self.is_healthy(driver):
+            self._quit(driver)
+            driver = None
+            with self._cond:
+                self._stats["discarded"] += 1
+        if driver is None:
+            try:
+                driver = self.factory()
+            except Exception:
+                self._release_slot()
+                raise
+            pages = 0
+            with self._cond:
+                self._stats["created"] += 1
+        return driver, pages
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _return(self, driver, pages, broken):
+        if broken or pages >= self.max_pages or self._closed:
+            self._quit(driver)
+            with self._cond:
+                self._stats["discarded" if broken else "recycled"] += 1
+            self._release_slot()
+            return
+        with self._cond:
+            self._idle.append((driver, pages))
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Empresta um navegador do pool e o devolve ao final do bloco"""
+        driver, pages = self._acquire(self.acquire_timeout if timeout is None else timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            # Erros de página não invalidam o navegador, só se ele parar de responder
+            broken = not self.is_healthy(driver)
+            raise
+        finally:
+            self._return(driver, pages + 1, broken)
+
+    def stats(self):
+        """Ocupação do pool e tempo de espera por navegador"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            stats["max_size"] = self.max_size
+        checkouts = stats["checkouts"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / checkouts if checkouts else 0.0
+        return stats
+
+    def close(self):
+        """Encerra todos os navegadores ociosos; os emprestados fecham na devolução"""
+        with self._cond:
+            self._closed = True
+            ociosos, self._idle = self._idle, []
+            self._size -= len(ociosos)
+            self._cond.notify_all()
+        for driver, _ in ociosos:
+            self._quit(driver)
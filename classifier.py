@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Backends disponíveis para a classificação dos links
+CLASSIFIER_BACKENDS = {
+    "bart": {"model": "facebook/bart-large-mnli"},  # Referência, ~1.6 GB
+    "distil": {"model": "valhalla/distilbart-mnli-12-1"},
+    "quantized": {"model": "valhalla/distilbart-mnli-12-1", "quantize": True},  # int8 dinâmico
+    "onnx": {"model": "valhalla/distilbart-mnli-12-1", "onnx": True},  # ONNX Runtime
+}
+BASELINE_BACKEND = "bart"
+
+# Configurações da classificação dos links
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", BASELINE_BACKEND)
+# Backend desconhecido: resolve_model explica o erro no carregamento, sem derrubar a importação
+CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL") or CLASSIFIER_BACKENDS.get(CLASSIFIER_BACKEND, {}).get("model")
+CLASSIFIER_BATCH_SIZE = int(os.getenv("CLASSIFIER_BATCH_SIZE", "8"))
+CLASSIFIER_ONNX_DIR = os.getenv("CLASSIFIER_ONNX_DIR", "onnx_models")  # Modelos já exportados pelo backend onnx
+CLASSIFIER_CACHE_PATH = os.getenv("CLASSIFIER_CACHE_PATH", "classification_cache.db")
+CLASSIFIER_CACHE_TTL = int(os.getenv("CLASSIFIER_CACHE_TTL", str(7 * 24 * 3600)))  # 7 dias
+CLASSIFIER_CACHE_MAX_ENTRIES = int(os.getenv("CLASSIFIER_CACHE_MAX_ENTRIES", "50000"))
+CANDIDATE_LABELS = [
+    "e-sports organization",
+    "competitive gaming",
+    "personal profile",
+    "gaming news",
+    "streaming channel",
+    "game developer",
+    "fan community",
+    "esports tournament"
+]
+
+
+def resolve_model(backend=CLASSIFIER_BACKEND, model=None):
+    """Modelo usado pelo backend (CLASSIFIER_MODEL só vale para o backend configurado)"""
+    if backend not in CLASSIFIER_BACKENDS:
+        raise ValueError(
+            f"Backend de classificação desconhecido: {backend} (opções: {', '.join(CLASSIFIER_BACKENDS)})"
+        )
+    if model:
+        return model
+    return CLASSIFIER_MODEL if backend == CLASSIFIER_BACKEND else CLASSIFIER_BACKENDS[backend]["model"]
+
+
+def backend_id(backend=CLASSIFIER_BACKEND, model=None):
+    """Identificador do backend + modelo, usado nas chaves do cache"""
+    return f"{backend}:{resolve_model(backend, model)}"
+
+
+def load_validator(backend=CLASSIFIER_BACKEND, model=None):
+    """Carrega o pipeline de classificação zero-shot do backend escolhido"""
+    # Antes do import do transformers: um backend inválido é explicado mesmo sem ele instalado
+    model = resolve_model(backend, model)
+    config = CLASSIFIER_BACKENDS[backend]
+
+    from transformers import pipeline
+
+    if config.get("onnx"):
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise ImportError("O backend 'onnx' requer: pip install optimum[onnxruntime]") from e
+        from transformers import AutoTokenizer
+
+        # A exportação para ONNX é lenta: feita uma vez, o modelo exportado é lido do disco nas próximas cargas
+        exportado = os.path.join(CLASSIFIER_ONNX_DIR, model.replace("/", "--"))
+        if os.path.exists(os.path.join(exportado, "config.json")):
+            tokenizer = AutoTokenizer.from_pretrained(exportado)
+            ort_model = ORTModelForSequenceClassification.from_pretrained(exportado)
+        else:
+            tokenizer = AutoTokenizer.from_pretrained(model)
+            ort_model = ORTModelForSequenceClassification.from_pretrained(model, export=True)
+            ort_model.save_pretrained(exportado)
+            tokenizer.save_pretrained(exportado)
+        return pipeline("zero-shot-classification", model=ort_model, tokenizer=tokenizer)
+
+    validador = pipeline("zero-shot-classification", model=model)
+    if config.get("quantize"):
+        import torch
+
+        # Quantização dinâmica das camadas lineares para int8 (CPU)
+        validador.model = torch.quantization.quantize_dynamic(validador.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return validador
+
+
+class ValidatorLoader:
+    """Carrega o classificador em segundo plano e expõe o estado de prontidão"""
+
+    def __init__(self, backend=CLASSIFIER_BACKEND, model=None):
+        self.backend = backend
+        self.model = model
+        self.error = None
+        self.load_seconds = None
+        self._validador = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Inicia o aquecimento do modelo em uma thread de fundo (uma única vez)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="validator-warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def _load(self):
+        inicio = time.perf_counter()
+        try:
+            self._validador = load_validator(self.backend, self.model)
+            # Uma inferência curta deixa pesos e kernels residentes antes do primeiro usuário
+            classify_texts(self._validador, ["warm-up"], batch_size=1)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.load_seconds = time.perf_counter() - inicio
+            self._ready.set()
+
+    @property
+    def ready(self):
+        return self._ready.is_set() and self.error is None
+
+    def get(self, timeout=None):
+        """Retorna o classificador, esperando o aquecimento terminar se preciso"""
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Modelo de classificação ainda está carregando")
+        if self.error is not None:
+            raise self.error
+        return self._validador
+
+    def status(self):
+        """Estado do carregamento para indicadores de UI e health checks"""
+        if not self._ready.is_set():
+            estado = "loading" if self._thread is not None else "idle"
+        else:
+            estado = "error" if self.error is not None else "ready"
+        try:
+            backend = backend_id(self.backend, self.model)
+        except ValueError:
+            backend = self.backend  # O erro do carregamento já explica o backend inválido
+        return {
+            "status": estado,
+            "backend": backend,
+            "load_seconds": self.load_seconds,
+            "error": str(self.error) if self.error is not None else None,
+        }
+
+
+class ClassificationCache:
+    """Cache persistente (SQLite) de classificações, endereçado pelo conteúdo da página"""
+
+    def __init__(self, path=CLASSIFIER_CACHE_PATH, ttl=CLASSIFIER_CACHE_TTL, max_entries=CLASSIFIER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS classificacoes ("
+                "chave TEXT PRIMARY KEY, categoria TEXT, confianca REAL, "
+                "criado_em REAL, acessado_em REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_acessado_em ON classificacoes (acessado_em)")
+
+    @staticmethod
+    def make_key(texto, candidate_labels, model):
+        """Hash do trecho normalizado + conjunto de categorias + modelo"""
+        normalizado = " ".join(texto.lower().split())
+        payload = json.dumps([model, sorted(candidate_labels), normalizado], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, chaves):
+        """Retorna {chave: (categoria, confiança)} para as entradas válidas"""
+        chaves = list(set(chaves))
+        if not chaves:
+            return {}
+        agora = time.time()
+        encontrados = {}
+        with self._lock, self._conn:
+            for i in range(0, len(chaves), 500):
+                lote = chaves[i:i + 500]
+                marcadores = ",".join("?" * len(lote))
+                rows = self._conn.execute(
+                    f"SELECT chave, categoria, confianca FROM classificacoes "
+                    f"WHERE chave IN ({marcadores}) AND criado_em >= ?",
+                    (*lote, agora - self.ttl),
+                ).fetchall()
+                encontrados.update({chave: (categoria, confianca) for chave, categoria, confianca in rows})
+            self._conn.executemany(
+                "UPDATE classificacoes SET acessado_em = ? WHERE chave = ?",
+                [(agora, chave) for chave in encontrados],
+            )
+            self.hits += len(encontrados)
+            self.misses += len(chaves) - len(encontrados)
+        return encontrados
+
+    def put_many(self, itens):
+        """Grava {chave: (categoria, confiança)} e aplica a política de expiração"""
+        agora = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO classificacoes VALUES (?, ?, ?, ?, ?)",
+                [(chave, categoria, confianca, agora, agora) for chave, (categoria, confianca) in itens.items()],
+            )
+        self.evict()
+
+    def evict(self):
+        """Remove entradas expiradas e as menos acessadas além do limite de tamanho"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM classificacoes WHERE criado_em < ?", (time.time() - self.ttl,))
+            excesso = self._conn.execute("SELECT COUNT(*) FROM classificacoes").fetchone()[0] - self.max_entries
+            if excesso > 0:
+                self._conn.execute(
+                    "DELETE FROM classificacoes WHERE chave IN "
+                    "(SELECT chave FROM classificacoes ORDER BY acessado_em LIMIT ?)",
+                    (excesso,),
+                )
+
+    def stats(self):
+        """Acertos, falhas e taxa de acerto do cache"""
+        with self._lock:
+            entradas = self._conn.execute("SELECT COUNT(*) FROM classificacoes").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": entradas,
+            }
+
+
+def classify_texts(validador, textos, candidate_labels=CANDIDATE_LABELS, batch_size=CLASSIFIER_BATCH_SIZE,
+                   cache=None, model=None):
+    """Classifica vários textos em lotes e retorna (categoria, confiança) para cada um
+
+    Os pares premissa/hipótese de todos os textos são agrupados pelo
+    pipeline em lotes de `batch_size`, com padding, em vez de uma
+    chamada por texto. Com `cache`, só os textos ainda não classificados
+    passam pelo modelo.
+    """
+    if not textos:
+        return []
+
+    if cache is None:
+        resultados = validador(list(textos), candidate_labels, batch_size=batch_size)
+        if isinstance(resultados, dict):
+            resultados = [resultados]
+        return [(r["labels"][0], r["scores"][0]) for r in resultados]
+
+    model = model or backend_id()
+    chaves = [cache.make_key(texto, candidate_labels, model) for texto in textos]
+    encontrados = cache.get_many(chaves)
+
+    # Textos repetidos no mesmo envio são classificados uma única vez
+    pendentes = {}
+    for chave, texto in zip(chaves, textos):
+        if chave not in encontrados:
+            pendentes.setdefault(chave, texto)
+    if pendentes:
+        novos = classify_texts(validador, list(pendentes.values()), candidate_labels, batch_size)
+        novos = dict(zip(pendentes, novos))
+        cache.put_many(novos)
+        encontrados.update(novos)
+    return [encontrados[chave] for chave in chaves]
+
+
+def measure_throughput(validador, textos, batch_sizes=(1, 2, 4, 8, 16), candidate_labels=CANDIDATE_LABELS):
+    """Mede links/segundo da classificação para cada tamanho de lote"""
+    # Aquecimento para não contar a primeira chamada do modelo
+    classify_texts(validador, textos[:1], candidate_labels, batch_size=1)
+
+    relatorio = []
+    for batch_size in batch_sizes:
+        inicio = time.perf_counter()
+        classify_texts(validador, textos, candidate_labels, batch_size=batch_size)
+        duracao = time.perf_counter() - inicio
+        relatorio.append({
+            "batch_size": batch_size,
+            "links": len(textos),
+            "segundos": round(duracao, 3),
+            "links_por_segundo": round(len(textos) / duracao, 2) if duracao else float("inf"),
+        })
+    return relatorio
+
+
+def evaluate_agreement(baseline, candidato, textos, candidate_labels=CANDIDATE_LABELS, batch_size=CLASSIFIER_BATCH_SIZE):
+    """Compara a categoria principal do candidato com a do baseline em um corpus fixo"""
+    relatorio = {}
+    previsoes = {}
+    for nome, validador in (("candidato", candidato), ("baseline", baseline)):
+        inicio = time.perf_counter()
+        previsoes[nome] = classify_texts(validador, textos, candidate_labels, batch_size)
+        relatorio[f"{nome}_segundos_por_link"] = round((time.perf_counter() - inicio) / len(textos), 4)
+
+    concordancias = sum(
+        1 for (cat_c, _), (cat_b, _) in zip(previsoes["candidato"], previsoes["baseline"]) if cat_c == cat_b
+    )
+    relatorio["concordancia"] = round(concordancias / len(textos), 3)
+    relatorio["speedup"] = round(
+        relatorio["baseline_segundos_por_link"] / relatorio["candidato_segundos_por_link"], 2
+    ) if relatorio["candidato_segundos_por_link"] else None
+    return relatorio
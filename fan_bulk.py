@@ -0,0 +1,349 @@
+"""Geração de perfis de fãs em lote, fora do app
+
+Uso: python -m fan_bulk [cadastros.jsonl|.csv|.xlsx] --output perfis.parquet [--shard 0/4]
+
+Sem arquivo de entrada, lê o cadastro de fãs (FAN_REGISTRY_PATH).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from fan_profile import METRIC_COLUMNS, generate_fan_profile, score_fans
+from registry import FAN_REGISTRY_PATH, FanRegistry, hash_cpf, normalize_cpf
+
+PROFILE_BULK_WORKERS = int(os.getenv("PROFILE_BULK_WORKERS", str(os.cpu_count() or 1)))
+CHUNK_SIZE = 10000  # Registros por tarefa enviada ao pool (pontuados juntos: lotes pequenos pagam o custo fixo do pandas)
+PARQUET_ROWS_PER_FILE = 50000
+KEY_SPACE = 16 ** 64  # Chaves são hashes sha256 em hexadecimal
+FLAT_COLUMNS = ["fan_key", "name", "twitter", "email", *METRIC_COLUMNS, "interests", "badges", "recommendations"]
+
+
+def shard_range(indice, total):
+    """Faixa de chaves [inicio, fim) do shard `indice` de `total`"""
+    if not 0 <= indice < total:
+        raise ValueError(f"Shard inválido: {indice}/{total}")
+    inicio = KEY_SPACE * indice // total
+    fim = KEY_SPACE * (indice + 1) // total
+    return (f"{inicio:064x}" if indice else None), (f"{fim:064x}" if indice + 1 < total else None)
+
+
+def _clean(registro):
+    """Ajusta uma linha de planilha ao formato salvo pelo formulário"""
+    registro = {k: v for k, v in registro.items() if v is not None}
+    if isinstance(registro.get("twitter_data"), str):
+        registro["twitter_data"] = json.loads(registro["twitter_data"]) if registro["twitter_data"] else None
+    return registro
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def read_csv(path):
+    import pandas as pd
+
+    # Em pedaços, para não carregar a planilha inteira; células vazias ficam "" como no formulário
+    for pedaco in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=CHUNK_SIZE):
+        for registro in pedaco.to_dict("records"):
+            yield _clean(registro)
+
+
+def _excel_cell(coluna, valor):
+    """Célula numérica como texto; o CPF digitado como número perde os zeros à esquerda e é completado"""
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        return valor
+    if coluna == "CPF" and float(valor).is_integer():
+        return f"{int(valor):011d}"
+    return str(valor)
+
+
+def read_excel(path):
+    from openpyxl import load_workbook
+
+    planilha = load_workbook(path, read_only=True).active
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = [str(c) for c in next(linhas, ())]
+    for valores in linhas:
+        yield _clean({c: _excel_cell(c, v) for c, v in zip(cabecalho, valores)})
+
+
+def read_registrations(path):
+    """Cadastros de um arquivo JSON lines, CSV ou Excel, um por vez"""
+    extensao = os.path.splitext(path)[1].lower()
+    if extensao in (".jsonl", ".json"):
+        return read_jsonl(path)
+    if extensao == ".csv":
+        return read_csv(path)
+    if extensao in (".xlsx", ".xlsm"):
+        return read_excel(path)
+    raise ValueError(f"Formato de entrada não suportado: {extensao}")
+
+
+def keyed(registros, start_key=None, end_key=None, skip=(), counts=None):
+    """(chave, registro) dos cadastros da faixa de chaves, ignorando os já processados
+
+    Se `counts` for um dicionário, `counts["skipped"]` recebe quantos
+    cadastros da entrada foram pulados por já estarem em `skip`.
+    """
+    for registro in registros:
+        if not normalize_cpf(registro.get("CPF")):
+            continue
+        chave = hash_cpf(registro["CPF"])
+        if (start_key and chave < start_key) or (end_key and chave >= end_key):
+            continue
+        if chave in skip:
+            if counts is not None:
+                counts["skipped"] = counts.get("skipped", 0) + 1
+            continue
+        yield chave, registro
+
+
+def profile_chunk(lote, columnar=False):
+    """Executado nos processos do pool: perfis de um lote de (chave, registro)
+
+    Saídas tabulares (`columnar`) recebem o lote pontuado de uma vez por
+    score_fans, já no formato das colunas. JSON lines precisa dos perfis
+    aninhados, que generate_fan_profile monta mais rápido registro a
+    registro do que to_profiles a partir das colunas.
+    """
+    if columnar:
+        import pandas as pd
+
+        return flatten([chave for chave, _ in lote], score_fans(pd.DataFrame([registro for _, registro in lote])))
+    perfis = []
+    for chave, registro in lote:
+        perfil = generate_fan_profile(registro)
+        perfil["metrics"] = dict(perfil["metrics"])
+        perfis.append((chave, perfil))
+    return perfis
+
+
+def _join(scored, colunas, separador):
+    """Textos das regras que se aplicam a cada fã, na ordem das colunas"""
+    if not colunas:
+        return [""] * len(scored)
+    valores = [scored[c].to_numpy(dtype=object, na_value=None).tolist() for c in colunas]
+    return [separador.join(t for t in linha if t is not None) for linha in zip(*valores)]
+
+
+def flatten(chaves, scored):
+    """Tabela (CSV/Parquet) com FLAT_COLUMNS a partir da saída de score_fans"""
+    import pandas as pd
+
+    tabela = pd.DataFrame({
+        "fan_key": chaves,
+        "name": scored["name"].to_numpy(dtype=object),
+        "twitter": scored["twitter"].to_numpy(dtype=object),
+        "email": scored["email"].to_numpy(dtype=object),
+    })
+    for metrica in METRIC_COLUMNS:
+        tabela[metrica] = scored[metrica].to_numpy(dtype="int64", na_value=0)  # Métrica ausente vale 0
+    tabela["interests"] = scored["interests"].to_numpy(dtype=object, na_value="")
+    tabela["badges"] = _join(scored, [c for c in scored.columns if c.startswith("badge_")], ", ")
+    tabela["recommendations"] = _join(scored, [c for c in scored.columns if c.startswith("rec_")], " | ")
+    return tabela
+
+
+class JSONLWriter:
+    columnar = False  # Recebe [(chave, perfil)]; as saídas tabulares recebem a tabela de `flatten`
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def done_keys(self):
+        if not os.path.exists(self.path):
+            return set()
+        chaves = set()
+        with open(self.path, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    chaves.add(json.loads(linha)["fan_key"])
+                except (ValueError, KeyError):
+                    continue  # Linha truncada por uma queda no meio da escrita
+        return chaves
+
+    def write(self, perfis):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        for chave, perfil in perfis:
+            self._file.write(json.dumps({"fan_key": chave, **perfil}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class CSVWriter(JSONLWriter):
+    columnar = True
+
+    def done_keys(self):
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, encoding="utf-8", newline="") as f:
+            return {linha["fan_key"] for linha in csv.DictReader(f) if linha.get("fan_key")}
+
+    def write(self, tabela):
+        novo = False
+        if self._file is None:
+            novo = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", encoding="utf-8", newline="")
+        # Dialeto excel, o padrão do módulo csv: a retomada lê o arquivo com csv.DictReader
+        tabela.to_csv(self._file, columns=FLAT_COLUMNS, header=novo, index=False, lineterminator="\r\n")
+        self._file.flush()
+
+
+class ParquetWriter:
+    """Grava em um diretório de arquivos part-NNNNN.parquet; cada arquivo fechado é um checkpoint"""
+    columnar = True
+
+    def __init__(self, path, rows_per_file=PARQUET_ROWS_PER_FILE):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("A saída em Parquet requer: pip install pyarrow") from e
+        self.path = path
+        self.rows_per_file = rows_per_file
+        self._buffer = []  # Tabelas de `flatten` ainda não gravadas
+        self._rows = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _parts(self):
+        return sorted(f for f in os.listdir(self.path) if f.startswith("part-") and f.endswith(".parquet"))
+
+    def done_keys(self):
+        import pyarrow.parquet as pq
+
+        chaves = set()
+        for parte in self._parts():
+            chaves.update(pq.read_table(os.path.join(self.path, parte), columns=["fan_key"]).column(0).to_pylist())
+        return chaves
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(c, pa.int64() if c in METRIC_COLUMNS else pa.string()) for c in FLAT_COLUMNS])
+        tabela = pa.Table.from_pandas(pd.concat(self._buffer, ignore_index=True), schema=schema, preserve_index=False)
+        tabela = tabela.replace_schema_metadata(None)  # Mesmas partes de antes, sem metadados do pandas
+        partes = self._parts()
+        numero = int(partes[-1][5:10]) + 1 if partes else 0
+        destino = os.path.join(self.path, f"part-{numero:05d}.parquet")
+        # Grava em arquivo temporário e renomeia: uma parte nunca fica pela metade
+        pq.write_table(tabela, destino + ".tmp")
+        os.replace(destino + ".tmp", destino)
+        self._buffer = []
+        self._rows = 0
+
+    def write(self, tabela):
+        self._buffer.append(tabela)
+        self._rows += len(tabela)
+        if self._rows >= self.rows_per_file:
+            self._flush()
+
+    def close(self):
+        self._flush()
+
+
+def create_writer(path):
+    if path.endswith(".jsonl"):
+        return JSONLWriter(path)
+    if path.endswith(".csv"):
+        return CSVWriter(path)
+    if path.endswith(".parquet"):
+        return ParquetWriter(path)
+    raise ValueError(f"Formato de saída não suportado: {path}")
+
+
+def _chunks(itens, tamanho):
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def run(registros, writer, workers=PROFILE_BULK_WORKERS, chunk_size=CHUNK_SIZE, progress_callback=None):
+    """Gera os perfis de (chave, registro) no pool de processos e grava em ordem
+
+    Só `2 * workers` lotes ficam em andamento, então a memória não cresce
+    com o tamanho da base. Retorna o número de perfis e os registros/s.
+    """
+    inicio = time.perf_counter()
+    total = 0
+    pendentes = deque()
+
+    def drenar():
+        nonlocal total
+        perfis = pendentes.popleft().result()
+        writer.write(perfis)
+        total += len(perfis)
+        if progress_callback:
+            progress_callback(total, total / (time.perf_counter() - inicio))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for lote in _chunks(registros, chunk_size):
+            pendentes.append(executor.submit(profile_chunk, lote, writer.columnar))
+            if len(pendentes) >= 2 * workers:
+                drenar()
+        while pendentes:
+            drenar()
+    writer.close()
+
+    segundos = time.perf_counter() - inicio
+    return {"profiles": total, "seconds": round(segundos, 2), "records_per_second": round(total / segundos, 1) if segundos else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", help="Cadastros em .jsonl, .csv ou .xlsx (padrão: o cadastro de fãs)")
+    parser.add_argument("--registry", default=FAN_REGISTRY_PATH, help="Banco do cadastro quando não há arquivo de entrada")
+    parser.add_argument("--output", default="perfis.jsonl", help="Saída .jsonl, .csv ou .parquet (diretório de partes)")
+    parser.add_argument("--workers", type=int, default=PROFILE_BULK_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--shard", help="Processa só o shard i de n da faixa de chaves, no formato i/n")
+    parser.add_argument("--start-key", help="Primeira chave (hash do CPF) incluída")
+    parser.add_argument("--end-key", help="Chave final (exclusiva)")
+    args = parser.parse_args()
+
+    start_key, end_key = args.start_key, args.end_key
+    if args.shard:
+        indice, total = (int(p) for p in args.shard.split("/"))
+        start_key, end_key = shard_range(indice, total)
+
+    writer = create_writer(args.output)
+    concluidos = writer.done_keys()  # Retomada: perfis já gravados na saída são pulados
+
+    if args.input:
+        registros = read_registrations(args.input)
+    else:
+        registros = (dados for _, dados in FanRegistry(args.registry).iter_fans(start_key=start_key, end_key=end_key))
+    contagem = {"skipped": 0}
+    registros = keyed(registros, start_key, end_key, skip=concluidos, counts=contagem)
+
+    resumo = run(
+        registros, writer, workers=args.workers, chunk_size=args.chunk_size,
+        progress_callback=lambda feitos, taxa: print(f"{feitos} perfis ({taxa:.0f} registros/s)", file=sys.stderr, flush=True),
+    )
+    # Só os cadastros desta entrada e deste shard: a saída pode ter perfis de outras execuções
+    resumo["skipped"] = contagem["skipped"]
+    print(json.dumps(resumo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+from rules import METRICS, get_rules
+
+
+def generate_fan_profile(data, rules=None):
+    """Gera um perfil completo do fã baseado nos dados coletados"""
+    profile = {
+        "basic_info": {
+            "name": data.get("Nome", ""),
+            "twitter": data.get("Twitter_Usuario", ""),
+            "email": data.get("Email", "")
+        },
+        "metrics": defaultdict(int),
+        "interests": [],
+        "recommendations": [],
+        "badges": []
+    }
+    
+    # Interesses do formulário
+    if "Interesses" in data:
+        interests = [i.strip() for i in data["Interesses"].split(",")]
+        profile["interests"] = interests
+        profile["metrics"]["interests_count"] = len(interests)
+    
+    # Eventos participados
+    if "Eventos_Participados" in data and data["Eventos_Participados"]:
+        profile["metrics"]["events_attended"] = len(data["Eventos_Participados"].split(","))
+    
+    # Compras realizadas
+    if "Compras_Realizadas" in data and data["Compras_Realizadas"]:
+        profile["metrics"]["purchases"] = len(data["Compras_Realizadas"].split(","))
+    
+    # Métricas do Twitter (se disponível), já agregadas durante a coleta paginada
+    if "twitter_data" in data and data["twitter_data"]:
+        twitter_metrics = data["twitter_data"].get("metrics", {})
+        profile["metrics"]["tweets_esports"] = twitter_metrics.get("tweets_esports", 0)
+        profile["metrics"]["engagement"] = twitter_metrics.get("engagement", 0)
+        
+        # Análise de contas seguidas (se disponível)
+        if "orgs_followed" in twitter_metrics:
+            profile["metrics"]["orgs_followed"] = twitter_metrics["orgs_followed"]
+    
+    # Recomendações e badges das regras configuradas (data/fan_rules.json)
+    rules = rules or get_rules()
+    profile["recommendations"], profile["badges"] = rules.evaluate(
+        profile["metrics"], {"top_interests": ", ".join(profile["interests"][:3])}
+    )
+    
+    return profile
+
+
+METRIC_COLUMNS = list(METRICS)
+
+
+def _count_items(coluna):
+    """Quantidade de itens separados por vírgula; NA onde o campo está vazio ou ausente"""
+    import pandas as pd
+
+    return (coluna.str.count(",") + 1).where(coluna.str.len() > 0, pd.NA).astype("Int64")
+
+
+def score_fans(fans, rules=None):
+    """Versão vetorizada de generate_fan_profile para um DataFrame de fãs
+
+    `fans` tem as colunas do formulário (Nome, Email, Twitter_Usuario,
+    Interesses, Eventos_Participados, Compras_Realizadas e, opcionalmente,
+    twitter_data). O resultado é colunar: os dados básicos, os interesses
+    normalizados ("a, b, c"), uma coluna Int64 por métrica (NA onde
+    generate_fan_profile não define a métrica) e uma coluna por regra
+    (rec_<id>/badge_<id>) com o texto ou None. `to_profiles` monta os dicts.
+    """
+    import pandas as pd
+
+    n = len(fans)
+
+    def coluna(nome):
+        if nome not in fans:
+            return pd.Series([None] * n, index=fans.index, dtype=object)
+        return fans[nome]
+
+    def texto(nome):
+        # Só strings contam como preenchidas (NaN de planilhas vira NA); colunas já textuais não são copiadas
+        valores = coluna(nome)
+        if valores.dtype == object:
+            valores = valores.where(valores.map(type) == str)
+        return valores.astype("string")
+
+    resultado = pd.DataFrame({
+        "name": coluna("Nome").fillna(""),
+        "twitter": coluna("Twitter_Usuario").fillna(""),
+        "email": coluna("Email").fillna(""),
+    }, index=fans.index)
+
+    # Interesses: itens sem espaços nas pontas, separados por ", " (o mesmo que strip() item a item)
+    interesses = texto("Interesses")
+    resultado["interests"] = interesses.str.strip().str.replace(r"\s*,\s*", ", ", regex=True)
+    resultado["interests_count"] = (interesses.str.count(",") + 1).astype("Int64")
+    resultado["events_attended"] = _count_items(texto("Eventos_Participados"))
+    resultado["purchases"] = _count_items(texto("Compras_Realizadas"))
+
+    # Métricas do Twitter já agregadas na coleta (dicts: extraídos com uma passada em Python)
+    metricas = [d.get("metrics", {}) if isinstance(d, dict) and d else None for d in coluna("twitter_data")]
+    for metrica in ("tweets_esports", "engagement"):
+        resultado[metrica] = pd.array([m.get(metrica, 0) if m is not None else pd.NA for m in metricas], dtype="Int64")
+    resultado["orgs_followed"] = pd.array(
+        [m.get("orgs_followed", pd.NA) if m is not None else pd.NA for m in metricas], dtype="Int64"
+    )
+
+    # Os três primeiros interesses, para os textos das regras: só quem tem mais de três precisa de corte
+    primeiros = resultado["interests"].copy()
+    muitos = (resultado["interests_count"] > 3).fillna(False).to_numpy()
+    primeiros[muitos] = primeiros[muitos].str.extract(r"^([^,]*(?:, [^,]*){2})", expand=False)
+
+    # Todas as regras avaliadas de uma vez sobre as colunas de métricas
+    rules = rules or get_rules()
+    for coluna, valores in rules.evaluate_frame(resultado[METRIC_COLUMNS], {"top_interests": primeiros}).items():
+        resultado[coluna] = valores
+    return resultado
+
+
+def to_profiles(scored):
+    """Converte a saída de score_fans em dicts no formato de generate_fan_profile"""
+    recomendacoes = [c for c in scored.columns if c.startswith("rec_")]
+    badges = [c for c in scored.columns if c.startswith("badge_")]
+    colunas = ["name", "twitter", "email", "interests", *METRIC_COLUMNS, *recomendacoes, *badges]
+    tabela = scored[colunas].astype(object)
+    tabela = tabela.where(tabela.notna(), None)
+    fim_metricas = 4 + len(METRIC_COLUMNS)
+    fim_recomendacoes = fim_metricas + len(recomendacoes)
+    perfis = []
+    for linha in tabela.itertuples(index=False, name=None):
+        nome, twitter, email, interesses = linha[:4]
+        perfis.append({
+            "basic_info": {"name": nome, "twitter": twitter, "email": email},
+            "metrics": {m: int(v) for m, v in zip(METRIC_COLUMNS, linha[4:fim_metricas]) if v is not None},
+            "interests": interesses.split(", ") if interesses is not None else [],
+            "recommendations": [r for r in linha[fim_metricas:fim_recomendacoes] if r is not None],
+            "badges": [b for b in linha[fim_recomendacoes:] if b is not None],
+        })
+    return perfis
@@ -0,0 +1,62 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor do processo: o app reexecuta o script (e o "Clear caches" do Streamlit limpa os recursos),
+# mas a porta só pode ser aberta uma vez
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_health_server(port, status_fn, host="0.0.0.0", metrics_fn=None):
+    """Sobe um endpoint HTTP /health para load balancers
+
+    Responde 200 quando `status_fn()` indica "ready" e 503 caso contrário,
+    com o estado completo em JSON no corpo. Com `metrics_fn`, também
+    serve /metrics (texto no formato do Prometheus) para scraping.
+    """
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            # As funções ficam no servidor: serve_health pode trocá-las sem reabrir a porta
+            metrics_fn, status_fn = self.server.metrics_fn, self.server.status_fn
+            if metrics_fn is not None and self.path.rstrip("/") == "/metrics":
+                self._reply(200, "text/plain; version=0.0.4; charset=utf-8", metrics_fn().encode("utf-8"))
+                return
+            if self.path.rstrip("/") not in ("/health", "/ready"):
+                self.send_error(404)
+                return
+            status = status_fn()
+            corpo = json.dumps(status).encode("utf-8")
+            self._reply(200 if status.get("status") == "ready" else 503, "application/json", corpo)
+
+        def _reply(self, codigo, content_type, corpo):
+            self.send_response(codigo)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, format, *args):
+            # Probes frequentes não devem poluir o log do Streamlit
+            pass
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.status_fn, server.metrics_fn = status_fn, metrics_fn
+    threading.Thread(target=server.serve_forever, name="health-server", daemon=True).start()
+    return server
+
+
+def serve_health(port, status_fn, host="0.0.0.0", metrics_fn=None):
+    """Servidor /health único do processo: sobe na primeira chamada e, nas seguintes, só atualiza as funções
+
+    Chamar de novo (ex.: depois de os recursos do app serem recriados) não
+    tenta abrir a porta outra vez.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = start_health_server(port, status_fn, host, metrics_fn)
+        else:
+            _server.status_fn, _server.metrics_fn = status_fn, metrics_fn
+        return _server
@@ -0,0 +1,285 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from browser import DriverPool
+from classifier import CLASSIFIER_BATCH_SIZE, classify_texts
+from metrics import observe, timed
+from vocabulary import get_vocabulary
+
+# Configurações da coleta de páginas
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+CHROME_WORKERS = int(os.getenv("CHROME_WORKERS", "2"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "10"))
+MIN_TEXT_CHARS = 200  # Abaixo disso a página provavelmente depende de JavaScript
+MAX_TEXT_CHARS = 2000
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+# Sites que só entregam conteúdo útil depois de executar JavaScript
+JS_HOSTS = ["twitter.com", "x.com", "instagram.com", "twitch.tv"]
+JS_MARKERS = ["enable javascript", "habilite o javascript", "ative o javascript"]
+
+
+def extract_text(html):
+    """Extrai o texto normalizado usado na classificação"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    return soup.get_text()[:MAX_TEXT_CHARS].lower()
+
+
+def needs_javascript(link, html):
+    """Indica se a página precisa ser renderizada no navegador"""
+    host = urlparse(link).netloc.lower()
+    if any(host == h or host.endswith("." + h) for h in JS_HOSTS):
+        return True
+    if not html:
+        return True
+
+    from bs4 import BeautifulSoup
+
+    texto = BeautifulSoup(html, 'html.parser').get_text(" ", strip=True)
+    if len(texto) < MIN_TEXT_CHARS:
+        return True
+    return any(marker in texto.lower() for marker in JS_MARKERS)
+
+
+def fetch_http(link, timeout=FETCH_TIMEOUT):
+    """Busca a página com uma requisição HTTP simples"""
+    import requests
+
+    response = requests.get(link, timeout=timeout, headers={"User-Agent": USER_AGENT})
+    response.raise_for_status()
+    return response.text
+
+
+def wait_until_ready(driver, timeout=FETCH_TIMEOUT):
+    """Espera o documento terminar de carregar em vez de um sleep fixo"""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+
+
+def fetch_with_driver(driver, link, timeout=FETCH_TIMEOUT):
+    """Renderiza a página no Chrome e retorna o HTML"""
+    driver.set_page_load_timeout(timeout)
+    driver.get(link)
+    wait_until_ready(driver, timeout)
+    return driver.page_source
+
+
+def _fetch_http_stage(link, timeout):
+    inicio = time.perf_counter()
+    try:
+        html = fetch_http(link, timeout)
+    except Exception as e:
+        observe("fetch", time.perf_counter() - inicio, error=True, method="http")
+        # Falhas de HTTP ainda podem funcionar no navegador
+        return None, e
+    observe("fetch", time.perf_counter() - inicio, method="http")
+    return html, None
+
+
+def _fetch_chrome_stage(driver_pool, link, html, erro, timeout):
+    # Inclui a espera por um navegador livre no pool
+    inicio = time.perf_counter()
+    try:
+        with driver_pool.checkout() as driver:
+            html_renderizado = fetch_with_driver(driver, link, timeout)
+    except Exception as e:
+        observe("fetch", time.perf_counter() - inicio, error=True, method="chrome")
+        # Mantém o HTML da requisição simples se o navegador falhar
+        return (html, None) if html else (None, erro or e)
+    observe("fetch", time.perf_counter() - inicio, method="chrome")
+    return html_renderizado, None
+
+
+def _http_then_check(link, timeout):
+    # A verificação de JavaScript também parseia o HTML: roda na thread da busca
+    html, erro = _fetch_http_stage(link, timeout)
+    return html, erro, needs_javascript(link, html)
+
+
+def iter_fetch_batches(links_list, driver_pool=None, workers=FETCH_WORKERS, chrome_workers=CHROME_WORKERS,
+                       timeout=FETCH_TIMEOUT):
+    """Busca as páginas em paralelo e produz listas de (link, html, erro) conforme ficam prontas
+
+    Cada lista reúne as páginas que terminaram desde a anterior, então
+    quem consome devagar recebe lotes maiores. Cada link é buscado
+    primeiro com HTTP simples; as páginas que dependem de JavaScript vão
+    para o Chrome, emprestado de `driver_pool` (sem pool, um temporário é
+    criado e encerrado ao final). Links repetidos são buscados uma vez e
+    entregues uma vez por ocorrência. Fechar o gerador antes do fim
+    cancela as buscas que ainda não começaram.
+    """
+    ocorrencias = Counter(links_list)
+    if not ocorrencias:
+        return
+
+    http = ThreadPoolExecutor(max_workers=max(1, min(workers, len(ocorrencias))))
+    chrome = None
+    pool = None
+    try:
+        # future -> (link, se ainda é a etapa HTTP)
+        pendentes = {http.submit(_http_then_check, link, timeout): (link, True) for link in ocorrencias}
+        while pendentes:
+            prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            lote = []
+            for future in prontos:
+                link, etapa_http = pendentes.pop(future)
+                try:
+                    if etapa_http:
+                        html, erro, precisa_js = future.result()
+                        if precisa_js:
+                            if chrome is None:
+                                pool = driver_pool or DriverPool(max_size=chrome_workers)
+                                chrome = ThreadPoolExecutor(max_workers=max(1, chrome_workers))
+                            pendentes[chrome.submit(_fetch_chrome_stage, pool, link, html, erro, timeout)] = (link, False)
+                            continue
+                    else:
+                        html, erro = future.result()
+                except Exception as e:
+                    # Um link malformado (ex.: "http://[abc") vira erro só dele, sem interromper os demais
+                    html, erro = None, e
+                lote.extend([(link, html, erro)] * ocorrencias[link])
+            if lote:
+                yield lote
+    finally:
+        http.shutdown(wait=False, cancel_futures=True)
+        if chrome is not None:
+            chrome.shutdown(wait=False, cancel_futures=True)
+        if pool is not None and driver_pool is None:
+            pool.close()
+
+
+def fetch_pages(links_list, driver_pool=None, workers=FETCH_WORKERS, chrome_workers=CHROME_WORKERS,
+                timeout=FETCH_TIMEOUT):
+    """Busca várias páginas em paralelo e retorna (link, html, erro) na ordem de entrada"""
+    results = {}
+    for lote in iter_fetch_batches(links_list, driver_pool, workers, chrome_workers, timeout):
+        for link, html, erro in lote:
+            results[link] = (html, erro)
+    return [(link, *results[link]) for link in links_list]
+
+
+def score_page(link, texto, primary_category, confidence, vocabulario, user_interests):
+    """Linha de resultado de um link já classificado, com a relevância para o perfil do usuário"""
+    # Verificação de relevância
+    relevance_score = 0
+
+    # 1. Termos de e-sports genéricos (uma única passada pelo texto)
+    relevant_terms = vocabulario.find(texto)
+    relevance_score += len(relevant_terms)
+
+    # 2. Interesses específicos do usuário
+    user_terms_found = vocabulario.find_interests(texto, user_interests, relevant_terms)
+    relevance_score += 2 * len(user_terms_found)  # Peso maior para interesses do usuário
+
+    # 3. Verificação de perfil pessoal (se for rede social)
+    is_personal_profile = False
+    social_platforms = ["twitter.com", "instagram.com", "twitch.tv", "youtube.com"]
+    if any(plat in link for plat in social_platforms):
+        profile_indicators = ["profile", "perfil", "user", "sobre", "about", "bio"]
+        if any(ind in texto for ind in profile_indicators):
+            is_personal_profile = True
+
+    # Determinar relevância geral
+    if relevance_score >= 3:
+        relevance = "Alta"
+    elif relevance_score >= 1:
+        relevance = "Média"
+    else:
+        relevance = "Baixa"
+
+    # Se for perfil pessoal mas não tem termos relevantes, considerar baixa relevância
+    if is_personal_profile and relevance_score == 0:
+        relevance = "Baixa"
+
+    return {
+        "Link": link,
+        "Categoria": primary_category,
+        "Confiança": f"{confidence*100:.1f}%",
+        "Relevância": relevance,
+        "Termos Encontrados": ", ".join(relevant_terms),
+        "Interesses do Usuário": ", ".join(user_terms_found),
+        "Pontuação": relevance_score
+    }
+
+
+def error_row(link, erro):
+    return {
+        "Link": link,
+        "Categoria": "Erro",
+        "Confiança": "N/A",
+        "Relevância": "N/A",
+        "Termos Encontrados": f"Erro: {str(erro)}",
+        "Interesses do Usuário": "N/A",
+        "Pontuação": 0
+    }
+
+
+def analyze_pages(links_list, validador, user_interests=None, driver_pool=None, cache=None, model=None,
+                  batch_size=CLASSIFIER_BATCH_SIZE):
+    """Busca, classifica e pontua os links, produzindo cada linha de resultado assim que fica pronta
+
+    As páginas são classificadas em pequenos lotes, com as que chegaram
+    enquanto o lote anterior era classificado (até `batch_size`), então o
+    primeiro resultado sai depois de uma busca e uma classificação, não
+    do lote inteiro. As linhas saem na ordem em que ficam prontas; falhas
+    de busca ou de classificação viram linhas com categoria "Erro".
+    Fechar o gerador cancela as buscas pendentes. `driver_pool`, `cache` e
+    `model` seguem iter_fetch_batches e classify_texts.
+    """
+    if user_interests is None:
+        user_interests = []
+
+    # Vocabulário compilado (recarregado automaticamente se o arquivo mudar)
+    vocabulario = get_vocabulary()
+
+    buscas = iter_fetch_batches(links_list, driver_pool=driver_pool)
+    try:
+        for lote in buscas:
+            paginas = []
+            for link, html, erro in lote:
+                if erro:
+                    yield error_row(link, erro)
+                    continue
+                try:
+                    with timed("parse"):
+                        paginas.append((link, extract_text(html)))
+                except Exception as e:
+                    yield error_row(link, e)
+
+            for inicio in range(0, len(paginas), batch_size):
+                parte = paginas[inicio:inicio + batch_size]
+                try:
+                    with timed("classify"):
+                        classificacoes = classify_texts(
+                            validador,
+                            [texto for _, texto in parte],
+                            batch_size=batch_size,
+                            cache=cache,
+                            model=model
+                        )
+                except Exception as e:
+                    for link, _ in parte:
+                        yield error_row(link, e)
+                    continue
+
+                for (link, texto), (primary_category, confidence) in zip(parte, classificacoes):
+                    try:
+                        with timed("score"):
+                            linha = score_page(link, texto, primary_category, confidence, vocabulario,
+                                               user_interests)
+                    except Exception as e:
+                        linha = error_row(link, e)
+                    yield linha
+    finally:
+        buscas.close()
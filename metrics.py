@@ -0,0 +1,208 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRICS_PREFIX = "kyf"
+
+
+class Histogram:
+    """Histograma de buckets fixos: observar custa uma busca binária e um lock"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)  # O último é o +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, valor, erro=False):
+        i = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.sum += valor
+            self.errors += erro
+
+    def snapshot(self):
+        """(contagens acumuladas por bucket, contagem, soma, erros)"""
+        with self._lock:
+            contagens = list(self._counts)
+            count, soma, erros = self.count, self.sum, self.errors
+        acumulado = []
+        total = 0
+        for c in contagens:
+            total += c
+            acumulado.append(total)
+        return acumulado, count, soma, erros
+
+    def quantile(self, q):
+        """Estimativa do quantil por interpolação linear dentro do bucket, como o histogram_quantile do Prometheus"""
+        acumulado, count, _, _ = self.snapshot()
+        if not count:
+            return 0.0
+        alvo = q * count
+        i = bisect.bisect_left(acumulado, alvo)
+        if i >= len(self.buckets):
+            return self.buckets[-1]
+        inferior = self.buckets[i - 1] if i else 0.0
+        anterior = acumulado[i - 1] if i else 0
+        no_bucket = acumulado[i] - anterior
+        return inferior + (self.buckets[i] - inferior) * ((alvo - anterior) / no_bucket if no_bucket else 0)
+
+
+class Metrics:
+    """Latência por etapa do pipeline e estatísticas dos componentes compartilhados do processo"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages = {}  # (etapa, labels ordenados) -> Histogram
+        self._providers = {}  # componente -> função que retorna o stats() dele
+
+    def _histogram(self, stage, labels):
+        chave = (stage, tuple(sorted(labels.items())))
+        histograma = self._stages.get(chave)
+        if histograma is None:
+            with self._lock:
+                histograma = self._stages.setdefault(chave, Histogram(self.buckets))
+        return histograma
+
+    def observe(self, stage, seconds, error=False, **labels):
+        self._histogram(stage, labels).observe(seconds, error)
+
+    @contextmanager
+    def timed(self, stage, **labels):
+        """Mede o bloco como uma etapa; exceções contam como erro e são propagadas"""
+        inicio = time.perf_counter()
+        erro = False
+        try:
+            yield
+        except BaseException:
+            erro = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - inicio, erro, **labels)
+
+    def register_stats(self, component, stats_fn):
+        """Exporta o dicionário de `stats_fn()` como gauges `<prefixo>_<componente>_<chave>`"""
+        with self._lock:
+            self._providers[component] = stats_fn
+
+    def stages(self):
+        """Resumo por etapa para o painel de diagnóstico"""
+        with self._lock:
+            itens = sorted(self._stages.items())
+        resumo = []
+        for (stage, labels), histograma in itens:
+            _, count, soma, erros = histograma.snapshot()
+            resumo.append({
+                "stage": stage,
+                **dict(labels),
+                "count": count,
+                "errors": erros,
+                "mean_seconds": soma / count if count else 0.0,
+                "p50_seconds": histograma.quantile(0.5),
+                "p95_seconds": histograma.quantile(0.95),
+            })
+        return resumo
+
+    def components(self):
+        """stats() atual de cada componente registrado (o erro, se a leitura falhar)"""
+        with self._lock:
+            providers = dict(self._providers)
+        estado = {}
+        for componente, stats_fn in providers.items():
+            try:
+                estado[componente] = stats_fn()
+            except Exception as e:
+                estado[componente] = {"error": str(e)}
+        return estado
+
+    def render(self):
+        """Todas as métricas no formato texto de exposição do Prometheus"""
+        linhas = []
+        nome = f"{METRICS_PREFIX}_stage_seconds"
+        linhas.append(f"# HELP {nome} Latência por etapa do pipeline")
+        linhas.append(f"# TYPE {nome} histogram")
+        erros = []
+        with self._lock:
+            itens = sorted(self._stages.items())
+        for (stage, labels), histograma in itens:
+            acumulado, count, soma, n_erros = histograma.snapshot()
+            base = {"stage": stage, **dict(labels)}
+            for limite, total in zip(self.buckets + (math.inf,), acumulado):
+                le = "+Inf" if limite == math.inf else repr(float(limite))
+                linhas.append(f"{nome}_bucket{_labels({**base, 'le': le})} {total}")
+            linhas.append(f"{nome}_sum{_labels(base)} {soma:.6f}")
+            linhas.append(f"{nome}_count{_labels(base)} {count}")
+            erros.append(f"{METRICS_PREFIX}_stage_errors_total{_labels(base)} {n_erros}")
+        if erros:
+            linhas.append(f"# TYPE {METRICS_PREFIX}_stage_errors_total counter")
+            linhas.extend(erros)
+
+        for componente, stats in self.components().items():
+            amostras = []
+            _flatten(f"{METRICS_PREFIX}_{componente}", stats, {}, amostras)
+            # O formato exige as amostras de uma mesma métrica juntas
+            por_metrica = {}
+            for metrica, labels, valor in amostras:
+                por_metrica.setdefault(metrica, []).append(f"{metrica}{_labels(labels)} {valor}")
+            for metrica, linhas_metrica in por_metrica.items():
+                linhas.append(f"# TYPE {metrica} gauge")
+                linhas.extend(linhas_metrica)
+        return "\n".join(linhas) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    partes = []
+    for chave, valor in labels.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        partes.append(f'{chave}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def _metric_name(texto):
+    return "".join(c if c.isalnum() or c == "_" else "_" for c in texto)
+
+
+def _flatten(prefixo, stats, labels, amostras):
+    """Valores numéricos viram gauges; dicionários de dicionários (ex.: por regra, por endpoint) viram label "id" """
+    for chave, valor in stats.items():
+        if isinstance(valor, bool):
+            amostras.append((_metric_name(f"{prefixo}_{chave}"), labels, int(valor)))
+        elif isinstance(valor, (int, float)):
+            amostras.append((_metric_name(f"{prefixo}_{chave}"), labels, valor))
+        elif isinstance(valor, dict):
+            if valor and all(isinstance(v, dict) for v in valor.values()):
+                for item, sub in valor.items():
+                    _flatten(prefixo, sub, {**labels, "id": item}, amostras)
+            else:
+                _flatten(f"{prefixo}_{chave}", valor, labels, amostras)
+        # Textos (estado, último erro) ficam só no painel de diagnóstico
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Métricas compartilhadas pelo processo"""
+    return _metrics
+
+
+def timed(stage, **labels):
+    return _metrics.timed(stage, **labels)
+
+
+def observe(stage, seconds, error=False, **labels):
+    _metrics.observe(stage, seconds, error, **labels)
+
+
+def register_stats(component, stats_fn):
+    _metrics.register_stats(component, stats_fn)
@@ -0,0 +1,459 @@
+import hashlib
+import io
+import itertools
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from metrics import observe
+from validators import validate_cpf
+
+# Configurações da fila de OCR (Tesseract usa CPU: um processo por worker)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_MAX_PENDING = int(os.getenv("OCR_MAX_PENDING", "16"))  # Jobs na fila + em execução
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "256"))
+OCR_LANG = "por"
+TESSERACT_CMD = os.getenv("TESSERACT_CMD")  # Sem valor, o tesseract é procurado no PATH
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") != "0"
+OCR_TARGET_DPI = 300  # Resolução em que o Tesseract lê melhor o texto de documentos
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2000"))  # Lado maior (px) de fotos sem DPI confiável
+OCR_PDF_DPI = int(os.getenv("OCR_PDF_DPI", str(OCR_TARGET_DPI)))  # Resolução da rasterização das páginas
+OCR_PDF_MAX_PAGES = int(os.getenv("OCR_PDF_MAX_PAGES", "10"))
+CROP_THUMBNAIL_SIDE = 256  # Miniatura usada para achar a região do documento
+CROP_MIN_AREA = 0.2  # Regiões menores que isso (fração da imagem) não são tratadas como o documento
+OCR_MODE = os.getenv("OCR_MODE", "cpf")  # cpf: leitura rápida + releitura das regiões numéricas; full: documento inteiro
+OCR_LOCATE_SCALE = 0.5  # Escala da leitura usada para localizar as regiões no modo "cpf"
+CPF_DIGITS_CONFIG = "--psm 7 -c tessedit_char_whitelist=0123456789.-"  # Uma linha, só dígitos e pontuação do CPF
+CPF_PATTERN = re.compile(r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}')
+
+
+class QueueFull(Exception):
+    """A fila de OCR atingiu OCR_MAX_PENDING jobs"""
+
+
+def _init_worker(tesseract_cmd):
+    import pytesseract
+
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def otsu_threshold(histograma):
+    """Limiar que melhor separa fundo e texto em um histograma de 256 tons"""
+    total = sum(histograma)
+    soma_total = sum(i * h for i, h in enumerate(histograma))
+    soma_fundo = peso_fundo = 0
+    melhor, limiar = -1.0, 127
+    for i, h in enumerate(histograma):
+        peso_fundo += h
+        if peso_fundo == 0:
+            continue
+        peso_frente = total - peso_fundo
+        if peso_frente == 0:
+            break
+        soma_fundo += i * h
+        media_fundo = soma_fundo / peso_fundo
+        media_frente = (soma_total - soma_fundo) / peso_frente
+        variancia = peso_fundo * peso_frente * (media_fundo - media_frente) ** 2
+        if variancia > melhor:
+            melhor, limiar = variancia, i
+    return limiar
+
+
+def _scale(image, target_dpi=OCR_TARGET_DPI, max_side=OCR_MAX_SIDE):
+    """Fator de redução: até target_dpi em scans com DPI, até max_side px nas demais fotos"""
+    dpi = float(image.info.get("dpi", (0, 0))[0] or 0)
+    if dpi > 72:  # 72 costuma ser só o padrão gravado pela câmera, não a resolução real
+        return min(1.0, target_dpi / dpi)
+    return min(1.0, max_side / max(image.size))
+
+
+def document_bbox(gray):
+    """Caixa da região clara (o documento) sobre um fundo mais escuro, ou None"""
+    from PIL import ImageFilter
+
+    miniatura = gray.copy()
+    miniatura.thumbnail((CROP_THUMBNAIL_SIDE, CROP_THUMBNAIL_SIDE))
+    limiar = otsu_threshold(miniatura.histogram())
+    # O filtro de mediana remove pontos claros soltos fora do documento
+    mascara = miniatura.point(lambda p: 255 if p > limiar else 0).filter(ImageFilter.MedianFilter(5))
+    caixa = mascara.getbbox()
+    if caixa is None:
+        return None
+    largura, altura = miniatura.size
+    area = (caixa[2] - caixa[0]) * (caixa[3] - caixa[1]) / (largura * altura)
+    if area < CROP_MIN_AREA or area > 0.95:
+        return None  # Nada destacado do fundo (scan ou foto já recortada)
+    fx, fy = gray.width / largura, gray.height / altura
+    return (int(caixa[0] * fx), int(caixa[1] * fy), int(caixa[2] * fx), int(caixa[3] * fy))
+
+
+def preprocess(image):
+    """Prepara a foto do documento para o OCR
+
+    Reduz para a resolução útil ao Tesseract, converte para tons de cinza,
+    gira pela orientação EXIF, recorta a região do documento e binariza
+    (Otsu). Menos pixels e texto preto no branco deixam o OCR mais rápido.
+    """
+    from PIL import Image, ImageOps
+
+    escala = _scale(image)
+    tamanho = (max(1, int(image.width * escala)), max(1, int(image.height * escala)))
+    if escala < 1.0 and image.format == "JPEG":
+        # Decodifica o JPEG já reduzido (escala do DCT), sem abrir a foto inteira
+        image.draft("L", tamanho)
+    gray = image.convert("L")
+    if gray.size != tamanho:
+        gray = gray.resize(tamanho, Image.Resampling.LANCZOS)
+    gray.info["exif"] = image.info.get("exif", b"")
+    gray = ImageOps.exif_transpose(gray)
+
+    caixa = document_bbox(gray)
+    if caixa:
+        gray = gray.crop(caixa)
+    gray = ImageOps.autocontrast(gray)
+    limiar = otsu_threshold(gray.histogram())
+    return gray.point(lambda p: 255 if p > limiar else 0).convert("1")
+
+
+def load_image(data, preprocessed=OCR_PREPROCESS):
+    """Abre a imagem direto dos bytes do upload, sem arquivo temporário"""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    return preprocess(image) if preprocessed else image
+
+
+def _tesseract(fn, image, **kwargs):
+    import pytesseract
+
+    try:
+        return fn(image, output_type=pytesseract.Output.DICT, **kwargs)
+    except Exception as e:
+        # Algumas exceções do pytesseract não voltam pelo pickle e quebrariam o pool inteiro
+        raise RuntimeError(str(e) or type(e).__name__) from None
+
+
+def read_words(image, config=""):
+    """Palavras reconhecidas com caixa (left, top, right, bottom), confiança (0-1) e linha"""
+    import pytesseract
+
+    dados = _tesseract(pytesseract.image_to_data, image, lang=OCR_LANG, config=config)
+    palavras = []
+    for i, texto in enumerate(dados["text"]):
+        texto = texto.strip()
+        confianca = float(dados["conf"][i])
+        if not texto or confianca < 0:
+            continue
+        esquerda, topo = dados["left"][i], dados["top"][i]
+        palavras.append({
+            "text": texto,
+            "conf": confianca / 100,
+            "box": (esquerda, topo, esquerda + dados["width"][i], topo + dados["height"][i]),
+            "line": (dados["block_num"][i], dados["par_num"][i], dados["line_num"][i]),
+        })
+    return palavras
+
+
+def _lines(palavras):
+    linhas = {}
+    for palavra in palavras:
+        linhas.setdefault(palavra["line"], []).append(palavra)
+    return list(linhas.values())
+
+
+def _union(caixas):
+    return (min(c[0] for c in caixas), min(c[1] for c in caixas), max(c[2] for c in caixas), max(c[3] for c in caixas))
+
+
+def _candidate(texto, confianca, origem):
+    digitos = "".join(filter(str.isdigit, texto))
+    formatado = f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}" if len(digitos) == 11 else digitos
+    return {"cpf": formatado, "confidence": round(confianca, 3), "valid": validate_cpf(digitos), "source": origem}
+
+
+def cpf_regions(linhas):
+    """Caixas onde provavelmente está o CPF: sequências numéricas e o que vem depois do rótulo "CPF" """
+    regioes = []
+    depois_do_rotulo = False
+    for linha in linhas:
+        if depois_do_rotulo:
+            # Rótulo em uma linha e número na seguinte, como no RG
+            regioes.append(_union([p["box"] for p in linha]))
+            depois_do_rotulo = False
+        sequencia = []
+        for i, palavra in enumerate(linha + [None]):
+            if palavra is not None and sum(c.isdigit() for c in palavra["text"]) >= 2:
+                sequencia.append(palavra["box"])
+                continue
+            if sequencia and len(sequencia) <= 4:
+                regioes.append(_union(sequencia))
+            sequencia = []
+            if palavra is not None and "CPF" in palavra["text"].upper():
+                seguintes = [p["box"] for p in linha[i + 1:i + 4]]
+                if seguintes:
+                    regioes.append(_union(seguintes))
+                else:
+                    depois_do_rotulo = True
+    return list(dict.fromkeys(regioes))
+
+
+def read_document(image, mode=OCR_MODE):
+    """Texto do documento e o CPF encontrado, com confiança
+
+    No modo "cpf" a leitura completa é feita em resolução reduzida, só
+    para obter o texto e localizar as regiões numéricas; cada região é
+    então relida em resolução cheia com apenas dígitos permitidos. No
+    modo "full" o documento inteiro é lido em resolução cheia. Em ambos,
+    todos os candidatos passam por validate_cpf e o válido de maior
+    confiança é o escolhido.
+    """
+    from PIL import Image
+
+    escala = OCR_LOCATE_SCALE if mode == "cpf" else 1.0
+    leitura = image.convert("L")
+    if escala < 1.0:
+        leitura = leitura.resize((max(1, int(image.width * escala)), max(1, int(image.height * escala))),
+                                 Image.Resampling.LANCZOS)
+    linhas = _lines(read_words(leitura))
+    texto = "\n".join(" ".join(p["text"] for p in linha) for linha in linhas)
+
+    candidatos = []
+    for linha in linhas:
+        for trecho in CPF_PATTERN.finditer(" ".join(p["text"] for p in linha)):
+            confianca = min(p["conf"] for p in linha if any(c.isdigit() for c in p["text"]))
+            candidatos.append(_candidate(trecho.group(), confianca, "text"))
+
+    if mode == "cpf":
+        margem = 6
+        for caixa in cpf_regions(linhas):
+            recorte = image.crop((
+                max(0, int(caixa[0] / escala) - margem), max(0, int(caixa[1] / escala) - margem),
+                min(image.width, int(caixa[2] / escala) + margem), min(image.height, int(caixa[3] / escala) + margem),
+            ))
+            palavras = read_words(recorte, config=CPF_DIGITS_CONFIG)
+            if palavras:
+                candidatos.append(_candidate(
+                    "".join(p["text"] for p in palavras), min(p["conf"] for p in palavras), "region"
+                ))
+
+    validos = [c for c in candidatos if c["valid"]]
+    melhor = max(validos, key=lambda c: c["confidence"]) if validos else None
+    return {
+        "text": texto,
+        "cpf": melhor["cpf"] if melhor else None,
+        "confidence": melhor["confidence"] if melhor else 0.0,
+        "candidates": candidatos,
+    }
+
+
+def extract_document_text(data, preprocessed=OCR_PREPROCESS, mode=OCR_MODE):
+    """OCR de uma imagem de documento; roda nos processos do pool
+
+    Retorna (resultado de read_document, início do processamento em
+    time.time()), para medir quanto tempo o job esperou na fila.
+    """
+    inicio = time.time()
+    return read_document(load_image(data, preprocessed), mode), inicio
+
+
+def _open_pdf(data):
+    try:
+        import pypdfium2
+    except ImportError as e:
+        raise ImportError("Suporte a PDF requer: pip install pypdfium2") from e
+    return pypdfium2.PdfDocument(data)
+
+
+def is_pdf(data):
+    return data[:5] == b"%PDF-"
+
+
+def pdf_page_count(data):
+    pdf = _open_pdf(data)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def extract_page_text(data, indice, dpi=OCR_PDF_DPI, preprocessed=OCR_PREPROCESS, mode=OCR_MODE):
+    """OCR de uma página do PDF; só esta página é rasterizada no processo"""
+    inicio = time.time()
+    pdf = _open_pdf(data)
+    try:
+        image = pdf[indice].render(scale=dpi / 72, grayscale=True).to_pil()
+    finally:
+        pdf.close()
+    image.info["dpi"] = (dpi, dpi)
+    return read_document(preprocess(image) if preprocessed else image, mode), inicio
+
+
+class OCRJob:
+    """Handle de um documento enviado para OCR, consultado pela interface"""
+
+    def __init__(self, id, key, future=None, result=None):
+        self.id = id
+        self.key = key
+        self.future = future
+        self.submitted_at = time.time()
+        self.wait_seconds = None
+        self.cached = future is None
+        self._result = result
+
+    def done(self):
+        return self.future is None or self.future.done()
+
+    def result(self):
+        """Resultado de read_document (levanta a exceção do OCR, se houve uma)"""
+        if self.future is not None:
+            return self.future.result()[0]
+        return self._result
+
+
+class OCRQueue:
+    """Pool limitado de processos para OCR, com cache pelo hash da imagem
+
+    `submit` nunca bloqueia: devolve um OCRJob que a interface consulta
+    a cada rerun. Reenvios do mesmo arquivo são respondidos pelo cache
+    (ou reaproveitam o job ainda em andamento).
+    """
+
+    def __init__(self, workers=OCR_WORKERS, max_pending=OCR_MAX_PENDING, cache_size=OCR_CACHE_MAX_ENTRIES,
+                 tesseract_cmd=TESSERACT_CMD):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cache_size = cache_size
+        # spawn: o processo do Streamlit tem threads, e fork com threads não é seguro
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(tesseract_cmd,),
+        )
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._cache = OrderedDict()  # hash -> resultado
+        self._pending = {}  # hash -> OCRJob em andamento
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "cache_hits": 0, "rejected": 0,
+                       "pdf_pages": 0, "pdf_pages_skipped": 0,
+                       "wait_seconds_total": 0.0, "wait_seconds_max": 0.0, "ocr_seconds_total": 0.0}
+
+    @staticmethod
+    def image_key(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def submit(self, data):
+        """Enfileira o OCR dos bytes da imagem e retorna o handle do job"""
+        chave = self.image_key(data)
+        with self._lock:
+            if chave in self._cache:
+                self._cache.move_to_end(chave)
+                self._stats["cache_hits"] += 1
+                return OCRJob(next(self._ids), chave, result=self._cache[chave])
+            if chave in self._pending:
+                return self._pending[chave]
+            if len(self._pending) >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise QueueFull(f"Fila de OCR cheia ({self.max_pending} documentos)")
+            if is_pdf(data):
+                job = OCRJob(next(self._ids), chave, future=Future())
+                threading.Thread(target=self._run_pdf, args=(data, job.future), daemon=True).start()
+            else:
+                job = OCRJob(next(self._ids), chave, future=self._executor.submit(extract_document_text, data))
+            self._pending[chave] = job
+            self._stats["submitted"] += 1
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _run_pdf(self, data, future):
+        """Distribui as páginas do PDF entre os workers e para no primeiro CPF válido
+
+        No máximo `workers` páginas ficam rasterizadas ao mesmo tempo; as
+        páginas seguintes só são enviadas quando uma termina.
+        """
+        try:
+            total = min(pdf_page_count(data), OCR_PDF_MAX_PAGES)
+            paginas = {}
+            inicio = None
+            em_andamento = {}
+            proxima = 0
+            encontrado = False
+            while not encontrado and (proxima < total or em_andamento):
+                while proxima < total and len(em_andamento) < self.workers:
+                    em_andamento[self._executor.submit(extract_page_text, data, proxima)] = proxima
+                    proxima += 1
+                prontas, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for pagina in prontas:
+                    resultado, comeco = pagina.result()
+                    paginas[em_andamento.pop(pagina)] = resultado
+                    inicio = comeco if inicio is None else min(inicio, comeco)
+                    encontrado = encontrado or resultado["cpf"] is not None
+            # Páginas que já estão rodando não podem ser canceladas; só as ainda na fila são poupadas
+            canceladas = sum(1 for pagina in em_andamento if pagina.cancel())
+            self._count("pdf_pages", len(paginas))
+            self._count("pdf_pages_skipped", total - proxima + canceladas)
+
+            lidas = [paginas[i] for i in sorted(paginas)]
+            melhor = max(lidas, key=lambda r: (r["cpf"] is not None, r["confidence"]), default=None)
+            resultado = {
+                "text": "\n\n".join(r["text"] for r in lidas),
+                "cpf": melhor["cpf"] if melhor else None,
+                "confidence": melhor["confidence"] if melhor else 0.0,
+                "candidates": [c for r in lidas for c in r["candidates"]],
+            }
+            future.set_result((resultado, inicio if inicio is not None else time.time()))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _count(self, nome, valor):
+        with self._lock:
+            self._stats[nome] += valor
+
+    def _finish(self, job, future):
+        agora = time.time()
+        with self._lock:
+            self._pending.pop(job.key, None)
+            try:
+                resultado, inicio = future.result()
+            except Exception:
+                self._stats["failed"] += 1
+                observe("ocr", agora - job.submitted_at, error=True)
+                return
+            job.wait_seconds = max(0.0, inicio - job.submitted_at)
+            observe("ocr_wait", job.wait_seconds)
+            observe("ocr", agora - inicio)
+            self._stats["completed"] += 1
+            self._stats["wait_seconds_total"] += job.wait_seconds
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], job.wait_seconds)
+            self._stats["ocr_seconds_total"] += agora - inicio
+            self._cache[job.key] = resultado
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def position(self, job):
+        """Quantos jobs foram enviados antes deste e ainda não terminaram"""
+        with self._lock:
+            return sum(1 for outro in self._pending.values() if outro.id < job.id)
+
+    def stats(self):
+        """Profundidade da fila, tempos de espera e de OCR, e acertos do cache"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+            agora = time.time()
+            # Jobs além dos workers estão esperando; o mais antigo dá a espera atual
+            esperando = sorted(self._pending.values(), key=lambda job: job.id)[self.workers:]
+            stats["queued"] = len(esperando)
+            stats["oldest_wait_seconds"] = round(agora - esperando[0].submitted_at, 2) if esperando else 0.0
+        concluidos = stats["completed"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / concluidos if concluidos else 0.0
+        stats["ocr_seconds_avg"] = stats["ocr_seconds_total"] / concluidos if concluidos else 0.0
+        stats["workers"] = self.workers
+        stats["cache_entries"] = len(self._cache)
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,110 @@
+import os
+import threading
+from collections import OrderedDict
+
+from vocabulary import get_vocabulary
+
+# Vereditos por conta guardados no processo (milhares de fãs seguem as mesmas poucas centenas de orgs)
+ORG_VERDICT_CACHE_SIZE = int(os.getenv("ORG_VERDICT_CACHE_SIZE", "50000"))
+
+
+def _field(user, nome):
+    if isinstance(user, dict):
+        return user.get(nome)
+    return getattr(user, nome, None)
+
+
+class OrgAccountClassifier:
+    """Decide quais contas seguidas são organizações de e-sports, com vereditos compartilhados entre fãs
+
+    Contas do índice (IDs e handles listados no vocabulário) são
+    resolvidas com uma consulta a dicionário. As demais passam pelo
+    fallback uma única vez: o veredito fica em cache por conta e vale
+    para todos os fãs que a seguem. O cache é descartado quando o
+    vocabulário é recarregado.
+    """
+
+    def __init__(self, cache_size=ORG_VERDICT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # ID (ou @handle) -> organização ou None
+        self._vocabulary = None
+        self._stats = {"index_hits": 0, "cache_hits": 0, "fallback_checks": 0, "fallback_matches": 0}
+
+    @staticmethod
+    def fallback(user, vocabulario):
+        """Organização mencionada na descrição (palavra inteira) ou no começo/fim do handle ("furiagg"), ou None"""
+        descricao = _field(user, "description")
+        if descricao:
+            nomes = vocabulario.find(descricao, categories={"organizacao"})
+            if nomes:
+                return nomes[0]
+        username = _field(user, "username")
+        if username:
+            return vocabulario.handle_owner(username)
+        return None
+
+    def classify(self, users, vocabulario=None):
+        """[(conta, organização)] das contas que são organizações, em uma passada pelas contas"""
+        vocabulario = vocabulario or get_vocabulary()
+        users = list(users)
+        donos = [None] * len(users)  # Organização de cada conta, na ordem recebida
+        desconhecidas = []
+        contagem = {"index_hits": 0, "cache_hits": 0}
+        with self._lock:
+            if vocabulario is not self._vocabulary:
+                self._cache.clear()
+                self._vocabulary = vocabulario
+            for i, user in enumerate(users):
+                conta_id, username = _field(user, "id"), _field(user, "username")
+                nome = vocabulario.account_owner(conta_id, username)
+                if nome:
+                    contagem["index_hits"] += 1
+                    donos[i] = nome
+                    continue
+                chave = str(conta_id) if conta_id is not None else f"@{(username or '').lower()}"
+                if chave in self._cache:
+                    contagem["cache_hits"] += 1
+                    self._cache.move_to_end(chave)
+                    donos[i] = self._cache[chave]
+                    continue
+                desconhecidas.append((i, chave, user))
+
+        # O fallback roda fora do lock; contas repetidas na mesma página são avaliadas uma vez
+        vereditos = {}
+        for i, chave, user in desconhecidas:
+            if chave not in vereditos:
+                vereditos[chave] = self.fallback(user, vocabulario)
+            donos[i] = vereditos[chave]
+
+        with self._lock:
+            for chave, valor in contagem.items():
+                self._stats[chave] += valor
+            self._stats["fallback_checks"] += len(vereditos)
+            self._stats["fallback_matches"] += sum(1 for nome in vereditos.values() if nome)
+            if vocabulario is self._vocabulary:
+                self._cache.update(vereditos)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [(user, nome) for user, nome in zip(users, donos) if nome]
+
+    def stats(self):
+        """Contas resolvidas pelo índice, pelo cache de vereditos e pelo fallback"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cache_entries"] = len(self._cache)
+        consultas = stats["index_hits"] + stats["cache_hits"] + stats["fallback_checks"]
+        stats["fallback_ratio"] = stats["fallback_checks"] / consultas if consultas else 0.0
+        return stats
+
+
+_classifier = OrgAccountClassifier()
+
+
+def get_org_classifier():
+    """Classificador de contas compartilhado pelo processo"""
+    return _classifier
+
+
+def org_stats():
+    return _classifier.stats()
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# Configurações do cadastro de fãs
+FAN_REGISTRY_PATH = os.getenv("FAN_REGISTRY_PATH", "fan_registry.db")
+CPF_HASH_SALT = os.getenv("CPF_HASH_SALT", "")
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS fas (
+        cpf_hash TEXT PRIMARY KEY,
+        nome TEXT,
+        email TEXT,
+        twitter TEXT,
+        dados TEXT NOT NULL,
+        criado_em TEXT NOT NULL,
+        atualizado_em TEXT NOT NULL,
+        versao INTEGER NOT NULL DEFAULT 1
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_fas_email ON fas (email)",
+    "CREATE INDEX IF NOT EXISTS idx_fas_twitter ON fas (twitter)",
+    # Histórico append-only: cada envio do formulário vira uma linha
+    """CREATE TABLE IF NOT EXISTS fas_historico (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cpf_hash TEXT NOT NULL,
+        dados TEXT NOT NULL,
+        registrado_em TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_historico_cpf ON fas_historico (cpf_hash)",
+]
+
+
+def normalize_cpf(cpf):
+    """Só os dígitos do CPF"""
+    return ''.join(filter(str.isdigit, str(cpf or "")))
+
+
+def hash_cpf(cpf):
+    """Chave do fã: hash do CPF normalizado (com sal opcional via CPF_HASH_SALT)"""
+    return hashlib.sha256((CPF_HASH_SALT + normalize_cpf(cpf)).encode("utf-8")).hexdigest()
+
+
+def normalize_email(email):
+    return (email or "").strip().lower() or None
+
+
+def normalize_twitter(handle):
+    return (handle or "").strip().lstrip("@").lower() or None
+
+
+class FanRegistry:
+    """Cadastro durável de fãs em SQLite (WAL), com upsert transacional por CPF
+
+    Cada thread usa sua própria conexão; o WAL permite leituras enquanto
+    outra sessão grava, e as escritas concorrentes são serializadas pelo
+    SQLite em vez de uma sobrescrever a outra.
+    """
+
+    def __init__(self, path=FAN_REGISTRY_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(data, agora):
+        if not normalize_cpf(data.get("CPF")):
+            raise ValueError("Registro sem CPF")
+        return {
+            "cpf_hash": hash_cpf(data["CPF"]),
+            "nome": data.get("Nome"),
+            "email": normalize_email(data.get("Email")),
+            "twitter": normalize_twitter(data.get("Twitter_Usuario")),
+            "dados": json.dumps(data, ensure_ascii=False, default=str),
+            "agora": agora,
+        }
+
+    def upsert_many(self, registros):
+        """Grava vários fãs em uma única transação; retorna quantos foram gravados"""
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [self._row(data, agora) for data in registros]
+        if not rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                """INSERT INTO fas (cpf_hash, nome, email, twitter, dados, criado_em, atualizado_em)
+                   VALUES (:cpf_hash, :nome, :email, :twitter, :dados, :agora, :agora)
+                   ON CONFLICT (cpf_hash) DO UPDATE SET
+                       nome = excluded.nome,
+                       email = excluded.email,
+                       twitter = excluded.twitter,
+                       dados = excluded.dados,
+                       atualizado_em = excluded.atualizado_em,
+                       versao = fas.versao + 1""",
+                rows,
+            )
+            conn.executemany(
+                "INSERT INTO fas_historico (cpf_hash, dados, registrado_em) VALUES (:cpf_hash, :dados, :agora)",
+                rows,
+            )
+        return len(rows)
+
+    def upsert(self, data):
+        """Cria ou atualiza o fã identificado pelo CPF e retorna sua chave"""
+        self.upsert_many([data])
+        return hash_cpf(data["CPF"])
+
+    def _fetch(self, where, params):
+        rows = self._connection().execute(f"SELECT dados FROM fas WHERE {where}", params).fetchall()
+        return [json.loads(row["dados"]) for row in rows]
+
+    def get(self, cpf):
+        """Dados mais recentes do fã com este CPF (ou None)"""
+        encontrados = self._fetch("cpf_hash = ?", (hash_cpf(cpf),))
+        return encontrados[0] if encontrados else None
+
+    def find_by_email(self, email):
+        return self._fetch("email = ?", (normalize_email(email),))
+
+    def find_by_twitter(self, handle):
+        return self._fetch("twitter = ?", (normalize_twitter(handle),))
+
+    def history(self, cpf):
+        """Todos os envios do fã, do mais antigo para o mais recente"""
+        rows = self._connection().execute(
+            "SELECT dados, registrado_em FROM fas_historico WHERE cpf_hash = ? ORDER BY id", (hash_cpf(cpf),)
+        ).fetchall()
+        return [{"registrado_em": row["registrado_em"], "dados": json.loads(row["dados"])} for row in rows]
+
+    def duplicates(self, campo="email"):
+        """Emails ou handles usados por mais de um CPF, com a quantidade de cadastros"""
+        if campo not in ("email", "twitter"):
+            raise ValueError("Campo de deduplicação deve ser 'email' ou 'twitter'")
+        rows = self._connection().execute(
+            f"SELECT {campo}, COUNT(*) AS total FROM fas WHERE {campo} IS NOT NULL "
+            f"GROUP BY {campo} HAVING total > 1 ORDER BY total DESC"
+        ).fetchall()
+        return [(row[campo], row["total"]) for row in rows]
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM fas").fetchone()[0]
+
+    def iter_fans(self, batch_size=1000, start_key=None, end_key=None):
+        """Percorre os fãs em ordem de chave, em lotes, sem carregar tudo na memória
+
+        Devolve (cpf_hash, dados). `start_key`/`end_key` restringem a uma
+        faixa de chaves [start_key, end_key).
+        """
+        ultimo = start_key
+        inclusivo = True
+        while True:
+            condicoes, params = [], []
+            if ultimo is not None:
+                condicoes.append("cpf_hash >= ?" if inclusivo else "cpf_hash > ?")
+                params.append(ultimo)
+            if end_key is not None:
+                condicoes.append("cpf_hash < ?")
+                params.append(end_key)
+            where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+            rows = self._connection().execute(
+                f"SELECT cpf_hash, dados FROM fas {where} ORDER BY cpf_hash LIMIT ?", (*params, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row["cpf_hash"], json.loads(row["dados"])
+            ultimo, inclusivo = rows[-1]["cpf_hash"], False
@@ -0,0 +1,219 @@
+import json
+import operator
+import os
+import threading
+import time
+from string import Formatter
+
+# Regras de recomendações e badges, recarregadas quando o arquivo muda
+FAN_RULES_PATH = os.getenv(
+    "FAN_RULES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fan_rules.json"),
+)
+FAN_RULES_CHECK_INTERVAL = float(os.getenv("FAN_RULES_CHECK_INTERVAL", "2"))
+
+# Métricas calculadas por fan_profile que as regras podem usar (ausente vale 0)
+METRICS = ("interests_count", "events_attended", "purchases", "tweets_esports", "engagement", "orgs_followed")
+# Campos disponíveis nos textos além das métricas
+TEXT_FIELDS = ("top_interests",)
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+# Seção do arquivo e prefixo da coluna de cada regra na avaliação em lote
+KINDS = {"recomendacoes": "rec_", "badges": "badge_"}
+
+
+class Rule:
+    """Regra compilada: condições (todas precisam valer), exclusões e texto"""
+    __slots__ = ("id", "kind", "column", "conditions", "unless", "text", "fields")
+
+    def __init__(self, id, kind, conditions, unless, text):
+        self.id = id
+        self.kind = kind
+        self.column = KINDS[kind] + id
+        self.conditions = conditions  # [(métrica, função do operador, valor)]
+        self.unless = unless  # Posições, na tabela, de regras que impedem esta
+        self.text = text
+        self.fields = [campo for _, campo, _, _ in Formatter().parse(text) if campo]
+
+    def format(self, contexto):
+        return self.text.format(**contexto) if self.fields else self.text
+
+
+class RuleSet:
+    """Tabela de regras compilada uma vez e avaliada em uma passada por fã (ou por lote)"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._lock = threading.Lock()
+        self._evaluated = [0] * len(rules)
+        self._matched = [0] * len(rules)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Compila {"recomendacoes": [...], "badges": [...]} validando métricas, operadores, valores e textos"""
+        rules = []
+        posicoes = {}
+        for kind in KINDS:
+            for item in data.get(kind, []):
+                chave = (kind, item["id"])
+                if chave in posicoes:
+                    raise ValueError(f"Regra duplicada: {item['id']}")
+                conditions = []
+                for condicao in item.get("quando", []):
+                    if condicao["metrica"] not in METRICS:
+                        raise ValueError(f"Métrica desconhecida na regra {item['id']}: {condicao['metrica']}")
+                    if condicao["op"] not in OPERATORS:
+                        raise ValueError(f"Operador desconhecido na regra {item['id']}: {condicao['op']}")
+                    # As métricas são números: outro tipo só falharia ao avaliar o primeiro fã
+                    valor = condicao["valor"]
+                    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                        raise ValueError(f"Valor não numérico na regra {item['id']}: {valor!r}")
+                    conditions.append((condicao["metrica"], OPERATORS[condicao["op"]], valor))
+                unless = []
+                for outra in item.get("exceto", []):
+                    if (kind, outra) not in posicoes:
+                        raise ValueError(f"A regra {item['id']} só pode excluir regras anteriores: {outra}")
+                    unless.append(posicoes[(kind, outra)])
+                if not isinstance(item["texto"], str):
+                    raise ValueError(f"Texto da regra {item['id']} precisa ser uma string")
+                rule = Rule(item["id"], kind, conditions, unless, item["texto"])
+                for campo in rule.fields:
+                    if campo not in METRICS and campo not in TEXT_FIELDS:
+                        raise ValueError(f"Campo desconhecido no texto da regra {item['id']}: {campo}")
+                posicoes[chave] = len(rules)
+                rules.append(rule)
+        return cls(rules)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def evaluate(self, metrics, contexto=None):
+        """(recomendações, badges) de um fã a partir das suas métricas"""
+        casou = [False] * len(self.rules)
+        textos = {kind: [] for kind in KINDS}
+        campos = None
+        for i, rule in enumerate(self.rules):
+            if any(casou[j] for j in rule.unless):
+                continue
+            if all(op(metrics.get(metrica, 0), valor) for metrica, op, valor in rule.conditions):
+                casou[i] = True
+                if rule.fields and campos is None:
+                    campos = {**{m: metrics.get(m, 0) for m in METRICS}, **(contexto or {})}
+                textos[rule.kind].append(rule.format(campos))
+        with self._lock:
+            for i, ok in enumerate(casou):
+                self._evaluated[i] += 1
+                self._matched[i] += ok
+        return textos["recomendacoes"], textos["badges"]
+
+    def evaluate_frame(self, metricas, contexto=None):
+        """Avalia todas as regras para um lote de fãs de uma vez
+
+        `metricas` é um DataFrame com uma coluna por métrica (NA vale 0) e
+        `contexto` traz Series para os campos de texto. Retorna {coluna da
+        regra: Series com o texto onde a regra se aplica e None no resto}.
+        """
+        import numpy as np
+        import pandas as pd
+
+        n = len(metricas)
+        valores = {m: metricas[m].fillna(0).to_numpy() if m in metricas else np.zeros(n, dtype=int) for m in METRICS}
+        casou = []
+        colunas = {}
+        for rule in self.rules:
+            mascara = np.ones(n, dtype=bool)
+            for metrica, op, valor in rule.conditions:
+                mascara &= op(valores[metrica], valor)
+            for j in rule.unless:
+                mascara &= ~casou[j]
+            casou.append(mascara)
+
+            if not rule.fields:
+                colunas[rule.column] = pd.Series(np.where(mascara, rule.text, None), index=metricas.index, dtype=object)
+                continue
+            # Texto com campos: concatena as partes como Series de strings
+            texto = pd.Series("", index=metricas.index, dtype="string")
+            for literal, campo, _, _ in Formatter().parse(rule.text):
+                texto = texto + literal
+                if campo:
+                    parte = contexto[campo] if campo in TEXT_FIELDS else pd.Series(valores[campo], index=metricas.index)
+                    texto = texto + parte.astype("string")
+            colunas[rule.column] = texto.astype(object).where(mascara, None)
+
+        with self._lock:
+            for i, mascara in enumerate(casou):
+                self._evaluated[i] += n
+                self._matched[i] += int(mascara.sum())
+        return colunas
+
+    def stats(self):
+        """Quantas vezes cada regra foi avaliada e quantas vezes se aplicou"""
+        with self._lock:
+            return {
+                rule.column: {"evaluated": self._evaluated[i], "matched": self._matched[i]}
+                for i, rule in enumerate(self.rules)
+            }
+
+
+class RuleStore:
+    """Mantém as regras compiladas e as recarrega quando o arquivo é alterado"""
+
+    def __init__(self, path=FAN_RULES_PATH, check_interval=FAN_RULES_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.error = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._rules = None
+
+    def get(self):
+        """Regras atuais, recompiladas se o arquivo mudou desde a última verificação"""
+        agora = time.monotonic()
+        if self._rules is not None and agora - self._checked_at < self.check_interval:
+            return self._rules
+
+        with self._lock:
+            self._checked_at = agora
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != self._mtime:
+                    self._rules = RuleSet.load(self.path)
+                    self._mtime = mtime
+                    self.reloads += 1
+                    self.error = None
+            except (OSError, ValueError, KeyError) as e:
+                # Arquivo inválido durante a edição: mantém a última versão boa
+                self.error = e
+                if self._rules is None:
+                    raise
+            return self._rules
+
+    def stats(self):
+        """Contadores por regra da versão atual, recargas e último erro de leitura"""
+        return {
+            "rules": self.get().stats(),
+            "reloads": self.reloads,
+            "error": str(self.error) if self.error else None,
+        }
+
+
+_store = RuleStore()
+
+
+def get_rules():
+    """Regras de recomendações e badges compartilhadas pelo processo"""
+    return _store.get()
+
+
+def rules_stats():
+    return _store.stats()
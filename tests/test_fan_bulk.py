@@ -0,0 +1,49 @@
+import json
+import sys
+
+from openpyxl import Workbook
+
+import fan_bulk
+from registry import hash_cpf
+
+
+def _write_xlsx(path, linhas):
+    planilha = Workbook()
+    aba = planilha.active
+    aba.append(["CPF", "Nome", "Email"])
+    for linha in linhas:
+        aba.append(linha)
+    planilha.save(path)
+
+
+def test_read_excel_keeps_leading_zeros_of_numeric_cpf(tmp_path):
+    path = str(tmp_path / "cadastros.xlsx")
+    # Célula numérica (como quando a planilha converte o CPF digitado em número), inteira e float
+    _write_xlsx(path, [[1234567890, "Ana", "ana@example.com"], [98765432100.0, "Bia", None], ["012.345.678-90", "Caio", None]])
+
+    registros = list(fan_bulk.read_excel(path))
+    assert [r["CPF"] for r in registros] == ["01234567890", "98765432100", "012.345.678-90"]
+    assert "Email" not in registros[1]
+
+    chaves = [chave for chave, _ in fan_bulk.keyed(registros)]
+    assert chaves[0] == hash_cpf("01234567890")
+    # Mesmo fã, digitado como texto ou como número
+    assert chaves[2] == chaves[0]
+
+
+def test_main_skipped_counts_only_this_input(tmp_path, monkeypatch, capsys):
+    entrada = tmp_path / "cadastros.jsonl"
+    saida = tmp_path / "perfis.jsonl"
+    # Perfis de uma execução anterior com outra entrada, além do fã que se repete
+    with open(saida, "w", encoding="utf-8") as f:
+        for cpf in ("11111111111", "22222222222", "33333333333"):
+            f.write(json.dumps({"fan_key": hash_cpf(cpf)}) + "\n")
+    with open(entrada, "w", encoding="utf-8") as f:
+        for cpf in ("33333333333", "44444444444"):
+            f.write(json.dumps({"CPF": cpf, "Nome": "Fã"}) + "\n")
+
+    monkeypatch.setattr(sys, "argv", ["fan_bulk", str(entrada), "--output", str(saida), "--workers", "1"])
+    fan_bulk.main()
+    resumo = json.loads(capsys.readouterr().out)
+    assert resumo["skipped"] == 1
+    assert resumo["profiles"] == 1
@@ -0,0 +1,123 @@
+import json
+import time
+
+import pytest
+import tweepy
+
+from benchmarks.twitter_stub import StubTwitterClient, _rate_limited_response
+from twitter_bulk import BulkTwitterAnalyzer, RateLimiter
+
+
+def test_rate_limiter_waits_for_next_window():
+    limiter = RateLimiter({"get_users": (2, 0.3)})
+    inicio = time.monotonic()
+    limiter.acquire("get_users")
+    limiter.acquire("get_users")
+    assert time.monotonic() - inicio < 0.1
+
+    limiter.acquire("get_users")
+    assert time.monotonic() - inicio >= 0.25
+    assert limiter.waited_seconds > 0
+    assert limiter.stats()["get_users"] == {"remaining": 1, "limit": 2}
+
+
+def test_rate_limiter_follows_api_headers():
+    limiter = RateLimiter({"get_users": (300, 900)})
+    limiter.acquire("get_users")
+    limiter.update("get_users", {
+        "x-rate-limit-limit": "900",
+        "x-rate-limit-remaining": "0",
+        "x-rate-limit-reset": str(int(time.time()) + 2),
+    })
+    assert limiter.stats()["get_users"] == {"remaining": 0, "limit": 900}
+
+    # Sem cota até o reset informado: a próxima chamada espera a nova janela
+    inicio = time.monotonic()
+    limiter.acquire("get_users")
+    assert time.monotonic() - inicio >= 0.9
+
+
+def test_success_headers_update_limiter(tmp_path):
+    cliente = StubTwitterClient(rate_limits={"get_users": (50, 900)})
+    analyzer = BulkTwitterAnalyzer(cliente, str(tmp_path / "perfis.jsonl"))
+    analyzer._call("get_users", cliente.get_users, usernames=["fa"])
+    analyzer._call("get_users", cliente.get_users, usernames=["fb"])
+    # Limite e restante vêm dos cabeçalhos da resposta de sucesso, não dos padrões locais (300)
+    assert analyzer.limiter.stats()["get_users"] == {"remaining": 48, "limit": 50}
+
+
+def test_call_retries_after_429_honoring_retry_after(tmp_path):
+    tentativas = []
+
+    def fn():
+        tentativas.append(time.monotonic())
+        if len(tentativas) == 1:
+            raise tweepy.errors.TooManyRequests(_rate_limited_response(300, 0))
+        return "ok"
+
+    analyzer = BulkTwitterAnalyzer(StubTwitterClient(), str(tmp_path / "perfis.jsonl"))
+    assert analyzer._call("get_users", fn) == "ok"
+    assert len(tentativas) == 2
+    # Retry-After: 1 (e a espera mínima do backoff) antes da nova tentativa
+    assert tentativas[1] - tentativas[0] >= 0.9
+
+
+def test_call_gives_up_after_max_retries(tmp_path):
+    def fn():
+        raise tweepy.errors.TooManyRequests(_rate_limited_response(300, 0))
+
+    analyzer = BulkTwitterAnalyzer(StubTwitterClient(), str(tmp_path / "perfis.jsonl"), max_retries=0)
+    with pytest.raises(tweepy.errors.TooManyRequests):
+        analyzer._call("get_users", fn)
+
+
+def test_run_recovers_from_stub_rate_limit(tmp_path):
+    # A cota local (15) é maior que a do stub (2 por segundo): o 429 ajusta o limiter e a análise continua
+    cliente = StubTwitterClient(max_tweets=5, max_following=20, rate_limits={"get_users_following": (2, 1)})
+    analyzer = BulkTwitterAnalyzer(cliente, str(tmp_path / "perfis.jsonl"), workers=1, max_tweets=5, max_following=20)
+    resumo = analyzer.run(["fa", "fb", "fc"])
+    assert resumo == {"skipped": 0, "ok": 3, "not_found": 0, "error": 0}
+    assert analyzer.limiter.waited_seconds > 0
+
+
+def test_run_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "perfis.jsonl")
+    cliente = StubTwitterClient(max_tweets=5, max_following=5)
+
+    resumo = BulkTwitterAnalyzer(cliente, checkpoint).run(["fa", "@FB", "missing1"])
+    assert resumo == {"skipped": 0, "ok": 2, "not_found": 1, "error": 0}
+
+    # Queda no meio de uma escrita e uma falha anterior: a linha truncada é ignorada e o erro é refeito
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"username": "fc", "status": "error", "error": "timeout"}) + "\n")
+        f.write('{"username": "fd", "sta')
+
+    chamadas = dict(cliente.calls)
+    resumo = BulkTwitterAnalyzer(cliente, checkpoint).run(["fa", "fb", "fc", "missing1"])
+    assert resumo == {"skipped": 3, "ok": 1, "not_found": 0, "error": 0}
+    # Só o fc foi buscado de novo
+    assert cliente.calls["get_users"] == chamadas["get_users"] + 1
+
+    ok = [r["username"] for r in _lines_ignoring_truncated(checkpoint) if r.get("status") == "ok"]
+    assert sorted(ok) == ["fa", "fb", "fc"]
+
+
+def test_skipped_counts_only_this_input(tmp_path):
+    checkpoint = str(tmp_path / "perfis.jsonl")
+    cliente = StubTwitterClient(max_tweets=5, max_following=5)
+    BulkTwitterAnalyzer(cliente, checkpoint).run(["fa", "fb"])
+
+    resumo = BulkTwitterAnalyzer(cliente, checkpoint).run(["fb", "fc"])
+    assert resumo["skipped"] == 1
+    assert resumo["ok"] == 1
+
+
+def _lines_ignoring_truncated(path):
+    registros = []
+    with open(path, encoding="utf-8") as f:
+        for linha in f:
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                continue
+    return registros
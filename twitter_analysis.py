@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import os
+
+from metrics import timed
+from org_accounts import get_org_classifier
+from twitter_records import TweetRecord, TwitterProfile, UserRecord
+from vocabulary import get_vocabulary
+
+# Configurações da coleta no Twitter (orçamento por fã; as páginas são percorridas até ele)
+MAX_TWEETS = int(os.getenv("TWITTER_MAX_TWEETS", "500"))
+MAX_FOLLOWING = int(os.getenv("TWITTER_MAX_FOLLOWING", "5000"))
+TWEETS_PAGE_SIZE = 100  # Máximo permitido por get_users_tweets
+FOLLOWING_PAGE_SIZE = 1000  # Máximo permitido por get_users_following
+MAX_TWEETS_KEPT = 50  # Tweets de e-sports guardados para exibição (os de maior engajamento)
+USER_FIELDS = ["public_metrics", "description", "profile_image_url"]
+TWEET_FIELDS = ["created_at", "public_metrics", "entities"]
+FOLLOWING_FIELDS = ["name", "username", "description", "public_metrics"]
+
+
+def get_twitter_client():
+    """Cria o cliente da API do Twitter a partir das variáveis de ambiente"""
+    import tweepy
+
+    return tweepy.Client(
+        bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
+        consumer_key=os.getenv('TWITTER_API_KEY'),
+        consumer_secret=os.getenv('TWITTER_API_SECRET'),
+        access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
+        access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
+    )
+
+
+def _direct_call(endpoint, fn, **kwargs):
+    with timed("twitter_api", endpoint=endpoint):
+        return fn(**kwargs)
+
+
+def iter_pages(call, endpoint, fn, limit, page_size, min_page_size=1, **kwargs):
+    """Percorre as páginas de um endpoint paginado até `limit` itens, uma página por vez
+
+    Nenhuma página anterior fica em memória: quem consome decide o que
+    guardar de cada uma.
+    """
+    token = None
+    coletados = 0
+    while coletados < limit:
+        tamanho = max(min_page_size, min(page_size, limit - coletados))
+        if token:
+            kwargs["pagination_token"] = token
+        resposta = call(endpoint, fn, max_results=tamanho, **kwargs)
+        pagina = (resposta.data or [])[:limit - coletados]
+        if pagina:
+            coletados += len(pagina)
+            yield pagina
+        token = (resposta.meta or {}).get("next_token")
+        if not token:
+            break
+
+
+class TweetMetrics:
+    """Acumula métricas de tweets página a página sem guardar todos os tweets"""
+
+    def __init__(self, vocabulario=None, keep=MAX_TWEETS_KEPT):
+        self.vocabulario = vocabulario or get_vocabulary()
+        self.keep = keep
+        self.analyzed = 0
+        self.esports = 0
+        self.engagement = 0
+        self._top = []  # Heap com os tweets de e-sports de maior engajamento
+        self._seq = itertools.count()
+
+    def add(self, tweets):
+        for tweet in tweets:
+            self.analyzed += 1
+            if not self.vocabulario.contains_any(tweet.text):
+                continue
+            registro = TweetRecord.from_api(tweet)
+            self.esports += 1
+            self.engagement += registro.engagement
+            # O contador desempata sem comparar os tweets; no empate fica o mais recente (primeiro visto)
+            item = (registro.engagement, -next(self._seq), registro)
+            if len(self._top) < self.keep:
+                heapq.heappush(self._top, item)
+            elif item[:2] > self._top[0][:2]:
+                heapq.heapreplace(self._top, item)
+
+    def top(self):
+        """Tweets de e-sports guardados, do maior para o menor engajamento"""
+        return [tweet for _, _, tweet in sorted(self._top, key=lambda item: item[:2], reverse=True)]
+
+
+class FollowingMetrics:
+    """Acumula as contas seguidas que são organizações de e-sports
+
+    A decisão fica com o classificador compartilhado (org_accounts): contas
+    do índice de organizações e vereditos já calculados para outros fãs não
+    passam de novo pelo vocabulário.
+    """
+
+    def __init__(self, vocabulario=None, classifier=None):
+        self.vocabulario = vocabulario or get_vocabulary()
+        self.classifier = classifier or get_org_classifier()
+        self.analyzed = 0
+        self.orgs = []
+
+    def add(self, users):
+        users = list(users)
+        self.analyzed += len(users)
+        for user, _ in self.classifier.classify(users, self.vocabulario):
+            self.orgs.append(UserRecord.from_api(user))
+
+
+def fetch_user_activity(client, user_id, call=None, max_tweets=MAX_TWEETS, max_following=MAX_FOLLOWING):
+    """Busca tweets e contas seguidas de um usuário já resolvido, página por página
+
+    `call(endpoint, fn, **kwargs)` permite que um agendador controle cada
+    chamada à API; por padrão a chamada é feita diretamente. A coleta para
+    em `max_tweets`/`max_following` itens e só guarda os tweets de e-sports
+    mais engajados e as organizações seguidas (como registros compactos),
+    além das métricas agregadas.
+    """
+    call = call or _direct_call
+    vocabulario = get_vocabulary()
+
+    # Busca tweets recentes
+    tweets = TweetMetrics(vocabulario)
+    for pagina in iter_pages(call, "get_users_tweets", client.get_users_tweets, max_tweets, TWEETS_PAGE_SIZE,
+                             min_page_size=5, id=user_id, tweet_fields=TWEET_FIELDS):
+        tweets.add(pagina)
+
+    # Busca contas seguidas
+    following = FollowingMetrics(vocabulario)
+    for pagina in iter_pages(call, "get_users_following", client.get_users_following, max_following,
+                             FOLLOWING_PAGE_SIZE, id=user_id, user_fields=FOLLOWING_FIELDS):
+        following.add(pagina)
+
+    metrics = {
+        "tweets_analyzed": tweets.analyzed,
+        "tweets_esports": tweets.esports,
+        "engagement": tweets.engagement,
+        "following_analyzed": following.analyzed,
+    }
+    if following.analyzed:
+        metrics["orgs_followed"] = len(following.orgs)
+
+    return {
+        "tweets": tweets.top(),
+        "following": following.orgs,
+        "metrics": metrics
+    }
+
+
+def fetch_twitter_profile(client, username, max_tweets=MAX_TWEETS, max_following=MAX_FOLLOWING):
+    """Busca usuário, tweets e contas seguidas de um perfil do Twitter (None se não existir)"""
+    user = _direct_call("get_user", client.get_user, username=username, user_fields=USER_FIELDS)
+    if user.data is None:
+        return None
+    atividade = fetch_user_activity(client, user.data.id, None, max_tweets, max_following)
+    return TwitterProfile(user=UserRecord.from_api(user.data), **atividade)
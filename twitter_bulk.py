@@ -0,0 +1,249 @@
+"""Análise em lote de perfis do Twitter respeitando os limites da API
+
+Uso: python -m twitter_bulk usernames.txt --output perfis_twitter.jsonl
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tweepy
+from dotenv import load_dotenv
+
+# Antes dos imports do projeto: os limites (TWITTER_MAX_*) são lidos do ambiente na importação
+load_dotenv()
+
+from twitter_analysis import MAX_FOLLOWING, MAX_TWEETS, USER_FIELDS, fetch_user_activity, get_twitter_client
+from twitter_records import TwitterProfile, UserRecord
+
+# Limites por janela de 15 minutos (autenticação de app, API v2); ajuste conforme o plano contratado
+RATE_LIMITS = {
+    "get_users": (300, 900),
+    "get_users_tweets": (1500, 900),
+    "get_users_following": (15, 900),
+}
+LOOKUP_BATCH_SIZE = 100  # Máximo de usernames por chamada de get_users
+BULK_WORKERS = int(os.getenv("TWITTER_BULK_WORKERS", "4"))
+MAX_RETRIES = 5
+
+
+class RateLimiter:
+    """Janelas de rate limit por endpoint, compartilhadas entre threads
+
+    Cada endpoint tem um limite de chamadas por janela. Quando a cota
+    acaba, quem chamar `acquire` espera a janela reabrir. Os cabeçalhos
+    x-rate-limit-* das respostas (inclusive de um 429) corrigem o estado
+    local com o que a API informou.
+    """
+
+    def __init__(self, limits=RATE_LIMITS, clock=time.monotonic):
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._windows = {
+            endpoint: {"limit": limite, "window": janela, "remaining": limite, "reset_at": None}
+            for endpoint, (limite, janela) in limits.items()
+        }
+        self.waited_seconds = 0.0
+
+    def acquire(self, endpoint):
+        """Reserva uma chamada ao endpoint, esperando a janela se a cota acabou"""
+        with self._cond:
+            w = self._windows[endpoint]
+            while True:
+                agora = self.clock()
+                if w["reset_at"] is None or agora >= w["reset_at"]:
+                    # Nova janela
+                    w["remaining"] = w["limit"]
+                    w["reset_at"] = agora + w["window"]
+                if w["remaining"] > 0:
+                    w["remaining"] -= 1
+                    return
+                espera = w["reset_at"] - agora
+                self.waited_seconds += espera
+                self._cond.wait(espera)
+
+    def update(self, endpoint, headers):
+        """Atualiza a janela com os cabeçalhos x-rate-limit-* da API"""
+        if not headers or "x-rate-limit-reset" not in headers:
+            return
+        with self._cond:
+            w = self._windows[endpoint]
+            reset_em = max(0.0, float(headers["x-rate-limit-reset"]) - time.time())
+            w["reset_at"] = self.clock() + reset_em
+            if "x-rate-limit-remaining" in headers:
+                w["remaining"] = int(headers["x-rate-limit-remaining"])
+            if int(headers.get("x-rate-limit-limit", 0)) > 0:
+                w["limit"] = int(headers["x-rate-limit-limit"])
+            self._cond.notify_all()
+
+    def exhaust(self, endpoint, headers=None, min_wait=1.0):
+        """Marca a cota do endpoint como esgotada (ex.: após um 429)
+
+        O reset informado pela API tem resolução de segundos, então a
+        espera nunca é menor que `min_wait`; um Retry-After da resposta
+        também é respeitado.
+        """
+        self.update(endpoint, headers)
+        if headers and str(headers.get("retry-after", "")).isdigit():
+            min_wait = max(min_wait, float(headers["retry-after"]))
+        with self._cond:
+            w = self._windows[endpoint]
+            w["remaining"] = 0
+            w["reset_at"] = max(w["reset_at"] or 0.0, self.clock() + min_wait)
+
+    def stats(self):
+        with self._cond:
+            return {
+                endpoint: {"remaining": w["remaining"], "limit": w["limit"]}
+                for endpoint, w in self._windows.items()
+            }
+
+
+class BulkTwitterAnalyzer:
+    """Analisa milhares de perfis com checkpoint, concorrência e controle de rate limit"""
+
+    def __init__(self, client, checkpoint_path, limiter=None, workers=BULK_WORKERS, max_retries=MAX_RETRIES,
+                 max_tweets=MAX_TWEETS, max_following=MAX_FOLLOWING):
+        self.client = client
+        self.max_tweets = max_tweets
+        self.max_following = max_following
+        self.checkpoint_path = checkpoint_path
+        self.limiter = limiter or RateLimiter()
+        self.workers = workers
+        self.max_retries = max_retries
+        self._write_lock = threading.Lock()
+        # tweepy.Response não traz os cabeçalhos HTTP: um hook na sessão guarda os da última resposta de cada thread
+        self._last_response = threading.local()
+        session = getattr(client, "session", None)
+        if session is not None:
+            session.hooks["response"].append(self._capture_response)
+
+    def _capture_response(self, response, *args, **kwargs):
+        self._last_response.headers = response.headers
+
+    def _call(self, endpoint, fn, **kwargs):
+        """Chamada à API agendada pelo rate limiter, com nova tentativa após 429"""
+        for tentativa in range(self.max_retries + 1):
+            self.limiter.acquire(endpoint)
+            self._last_response.headers = None
+            try:
+                resposta = fn(**kwargs)
+            except tweepy.errors.TooManyRequests as e:
+                # Backoff exponencial em sequências de 429
+                self.limiter.exhaust(endpoint, getattr(e.response, "headers", None), min_wait=2 ** tentativa)
+                if tentativa == self.max_retries:
+                    raise
+                continue
+            self.limiter.update(endpoint, getattr(resposta, "headers", None) or self._last_response.headers)
+            return resposta
+
+    def completed(self):
+        """Usernames já finalizados no checkpoint (sucesso ou não encontrados)"""
+        concluidos = set()
+        if not os.path.exists(self.checkpoint_path):
+            return concluidos
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue  # Linha truncada por uma queda no meio da escrita
+                if registro.get("status") in ("ok", "not_found"):
+                    concluidos.add(registro["username"].lower())
+        return concluidos
+
+    def _close_partial_line(self):
+        """Termina uma linha truncada no fim do checkpoint para o próximo registro não ser colado nela"""
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, "rb+") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def _save(self, registro):
+        with self._write_lock, open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+
+    def _resolve(self, usernames):
+        """Resolve até 100 usernames em uma única chamada de get_users"""
+        resposta = self._call("get_users", self.client.get_users, usernames=usernames, user_fields=USER_FIELDS)
+        return {user.username.lower(): user for user in (resposta.data or [])}
+
+    def _analyze_user(self, username, user):
+        try:
+            atividade = fetch_user_activity(
+                self.client, user.id, call=self._call, max_tweets=self.max_tweets, max_following=self.max_following
+            )
+        except Exception as e:
+            self._save({"username": username, "status": "error", "error": str(e)})
+            return "error"
+        perfil = TwitterProfile(user=UserRecord.from_api(user), **atividade)
+        self._save({"username": username, "status": "ok", "profile": perfil.to_dict()})
+        return "ok"
+
+    def run(self, usernames, progress_callback=None):
+        """Processa os usernames pendentes e retorna um resumo da execução"""
+        self._close_partial_line()
+        concluidos = self.completed()
+        entrada = list(dict.fromkeys(u.strip().lstrip("@").lower() for u in usernames if u.strip()))
+        pendentes = [u for u in entrada if u not in concluidos]
+        # Só os usernames desta entrada: o checkpoint pode ter outros de execuções anteriores
+        resumo = {"skipped": len(entrada) - len(pendentes), "ok": 0, "not_found": 0, "error": 0}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for i in range(0, len(pendentes), LOOKUP_BATCH_SIZE):
+                lote = pendentes[i:i + LOOKUP_BATCH_SIZE]
+                try:
+                    encontrados = self._resolve(lote)
+                except Exception as e:
+                    for username in lote:
+                        self._save({"username": username, "status": "error", "error": str(e)})
+                    resumo["error"] += len(lote)
+                    continue
+
+                futures = []
+                for username in lote:
+                    if username not in encontrados:
+                        self._save({"username": username, "status": "not_found"})
+                        resumo["not_found"] += 1
+                    else:
+                        futures.append(executor.submit(self._analyze_user, username, encontrados[username]))
+                for future in futures:
+                    resumo[future.result()] += 1
+
+                if progress_callback:
+                    progress_callback(min(i + LOOKUP_BATCH_SIZE, len(pendentes)), len(pendentes), resumo)
+        return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("usernames", help="Arquivo com um username por linha")
+    parser.add_argument("--output", default="perfis_twitter.jsonl", help="Checkpoint/saída em JSON lines")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS)
+    parser.add_argument("--max-tweets", type=int, default=MAX_TWEETS, help="Orçamento de tweets por fã")
+    parser.add_argument("--max-following", type=int, default=MAX_FOLLOWING, help="Orçamento de contas seguidas por fã")
+    args = parser.parse_args()
+
+    with open(args.usernames, encoding="utf-8") as f:
+        usernames = f.read().splitlines()
+
+    analyzer = BulkTwitterAnalyzer(
+        get_twitter_client(), args.output, workers=args.workers,
+        max_tweets=args.max_tweets, max_following=args.max_following
+    )
+    resumo = analyzer.run(
+        usernames,
+        progress_callback=lambda feitos, total, resumo: print(f"{feitos}/{total} {json.dumps(resumo)}", flush=True),
+    )
+    print(json.dumps(resumo))
+
+
+if __name__ == "__main__":
+    main()
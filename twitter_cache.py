@@ -0,0 +1,280 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Configurações do cache de perfis do Twitter
+TWITTER_CACHE_BACKEND = os.getenv("TWITTER_CACHE_BACKEND", "memory")  # memory, sqlite ou redis
+TWITTER_CACHE_PATH = os.getenv("TWITTER_CACHE_PATH", "twitter_cache.db")
+TWITTER_CACHE_URL = os.getenv("TWITTER_CACHE_URL", "redis://localhost:6379/0")
+TWITTER_CACHE_TTL = int(os.getenv("TWITTER_CACHE_TTL", "3600"))
+TWITTER_CACHE_NEGATIVE_TTL = int(os.getenv("TWITTER_CACHE_NEGATIVE_TTL", "300"))  # Usuários não encontrados
+TWITTER_CACHE_MAX_ENTRIES = int(os.getenv("TWITTER_CACHE_MAX_ENTRIES", "10000"))
+LOCK_TIMEOUT = 60  # Tempo máximo que uma busca pode segurar o lock de um username
+LOCK_POLL_INTERVAL = 0.2
+# Apaga a chave só se o valor ainda for o esperado (o lock não foi tomado por outra réplica)
+REDIS_DELETE_IF_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class MemoryBackend:
+    """LRU em memória, por processo"""
+
+    def __init__(self, max_entries=TWITTER_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # chave -> (valor, expira_em)
+        self._lock = threading.Lock()
+
+    def _valid(self, chave, agora):
+        item = self._data.get(chave)
+        if item is None:
+            return None
+        if item[1] <= agora:
+            del self._data[chave]
+            return None
+        return item
+
+    def get(self, chave):
+        with self._lock:
+            item = self._valid(chave, time.time())
+            if item is None:
+                return None
+            self._data.move_to_end(chave)
+            return item[0]
+
+    def set(self, chave, valor, ttl):
+        with self._lock:
+            self._data[chave] = (valor, time.time() + ttl)
+            self._data.move_to_end(chave)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, chave, valor, ttl):
+        """Grava só se a chave não existir (operação atômica)"""
+        with self._lock:
+            if self._valid(chave, time.time()) is not None:
+                return False
+            self._data[chave] = (valor, time.time() + ttl)
+            return True
+
+    def delete(self, chave):
+        with self._lock:
+            self._data.pop(chave, None)
+
+    def delete_if(self, chave, valor):
+        """Apaga a chave só se ela ainda guardar `valor` (operação atômica)"""
+        with self._lock:
+            item = self._valid(chave, time.time())
+            if item is not None and item[0] == valor:
+                del self._data[chave]
+
+
+class SQLiteBackend:
+    """Cache em disco compartilhado pelos processos da mesma máquina"""
+
+    def __init__(self, path=TWITTER_CACHE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (chave TEXT PRIMARY KEY, valor TEXT, expira_em REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_expira_em ON cache (expira_em)")
+
+    def get(self, chave):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valor FROM cache WHERE chave = ? AND expira_em > ?", (chave, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, chave, valor, ttl):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM cache WHERE expira_em <= ?", (time.time(),))
+                self._conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (chave, valor, time.time() + ttl))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def add(self, chave, valor, ttl):
+        """Grava só se a chave não existir (atômico entre processos)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM cache WHERE chave = ? AND expira_em <= ?", (chave, time.time()))
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO cache VALUES (?, ?, ?)", (chave, valor, time.time() + ttl)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def delete(self, chave):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE chave = ?", (chave,))
+
+    def delete_if(self, chave, valor):
+        """Apaga a chave só se ela ainda guardar `valor` (atômico entre processos)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE chave = ? AND valor = ?", (chave, valor))
+
+
+class RedisBackend:
+    """Cache compartilhado entre réplicas via Redis (ou qualquer cliente compatível)"""
+
+    def __init__(self, url=TWITTER_CACHE_URL, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("O backend 'redis' requer: pip install redis") from e
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+
+    def get(self, chave):
+        valor = self.client.get(chave)
+        return valor.decode("utf-8") if isinstance(valor, bytes) else valor
+
+    def set(self, chave, valor, ttl):
+        self.client.set(chave, valor, ex=max(1, int(ttl)))
+
+    def add(self, chave, valor, ttl):
+        return bool(self.client.set(chave, valor, ex=max(1, int(ttl)), nx=True))
+
+    def delete(self, chave):
+        self.client.delete(chave)
+
+    def delete_if(self, chave, valor):
+        self.client.eval(REDIS_DELETE_IF_SCRIPT, 1, chave, valor)
+
+
+def create_backend(nome=TWITTER_CACHE_BACKEND):
+    """Backend configurado por TWITTER_CACHE_BACKEND"""
+    if nome == "memory":
+        return MemoryBackend()
+    if nome == "sqlite":
+        return SQLiteBackend()
+    if nome == "redis":
+        return RedisBackend()
+    raise ValueError(f"Backend de cache desconhecido: {nome}")
+
+
+class ProfileCache:
+    """Cache de análises do Twitter com TTL, cache negativo e proteção contra stampede
+
+    Pedidos simultâneos para o mesmo username (no processo ou em outras
+    réplicas que usem o mesmo backend) resultam em uma única chamada à
+    API: quem pega o lock busca, os demais esperam o resultado aparecer.
+    """
+
+    def __init__(self, backend=None, ttl=TWITTER_CACHE_TTL, negative_ttl=TWITTER_CACHE_NEGATIVE_TTL,
+                 lock_timeout=LOCK_TIMEOUT, poll_interval=LOCK_POLL_INTERVAL):
+        self.backend = backend or create_backend()
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._guard = threading.Lock()
+        self._inflight = {}  # chave -> [lock, usuários esperando]
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "fetches": 0, "waits": 0}
+
+    @staticmethod
+    def _key(username):
+        return f"twitter:profile:{username.strip().lstrip('@').lower()}"
+
+    def _count(self, nome):
+        with self._guard:
+            self._stats[nome] += 1
+
+    def _lookup(self, chave):
+        """(encontrado, perfil) a partir do backend; perfil None é um 'não encontrado' cacheado"""
+        valor = self.backend.get(chave)
+        if valor is None:
+            return False, None
+        registro = json.loads(valor)
+        return True, registro.get("profile")
+
+    def _store(self, chave, perfil):
+        ttl = self.ttl if perfil is not None else self.negative_ttl
+        self.backend.set(chave, json.dumps({"profile": perfil}, separators=(",", ":")), ttl)
+
+    def _hit(self, perfil):
+        self._count("hits" if perfil is not None else "negative_hits")
+        return perfil
+
+    def get_or_fetch(self, username, fetch):
+        """Retorna o perfil cacheado ou chama `fetch()` uma única vez para todos os pedidos simultâneos
+
+        `fetch` deve retornar um dict serializável em JSON ou None (usuário
+        inexistente, guardado pelo TTL negativo). Exceções não são cacheadas.
+        """
+        chave = self._key(username)
+        encontrado, perfil = self._lookup(chave)
+        if encontrado:
+            return self._hit(perfil)
+        self._count("misses")
+
+        with self._guard:
+            entrada = self._inflight.setdefault(chave, [threading.Lock(), 0])
+            entrada[1] += 1
+        try:
+            # Uma thread por username dentro do processo...
+            with entrada[0]:
+                encontrado, perfil = self._lookup(chave)
+                if encontrado:
+                    return perfil
+
+                # ...e um processo por username entre as réplicas
+                lock_key = chave + ":lock"
+                token = uuid.uuid4().hex  # Identifica este dono do lock na hora de liberar
+                prazo = time.monotonic() + self.lock_timeout
+                adquirido = False
+                while not self.backend.add(lock_key, token, self.lock_timeout):
+                    self._count("waits")
+                    time.sleep(self.poll_interval)
+                    encontrado, perfil = self._lookup(chave)
+                    if encontrado:
+                        return perfil
+                    if time.monotonic() > prazo:
+                        break  # Dono do lock provavelmente caiu; busca mesmo assim
+                else:
+                    adquirido = True
+
+                try:
+                    self._count("fetches")
+                    perfil = fetch()
+                    self._store(chave, perfil)
+                    return perfil
+                finally:
+                    # Quem desistiu de esperar não apaga o lock de outro worker
+                    if adquirido:
+                        self.backend.delete_if(lock_key, token)
+        finally:
+            with self._guard:
+                entrada[1] -= 1
+                if entrada[1] == 0:
+                    del self._inflight[chave]
+
+    def invalidate(self, username):
+        self.backend.delete(self._key(username))
+
+    def stats(self):
+        """Contadores de acertos, falhas, buscas na API e esperas por lock"""
+        with self._guard:
+            stats = dict(self._stats)
+        consultas = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["hits"] + stats["negative_hits"]) / consultas if consultas else 0.0
+        return stats
@@ -0,0 +1,125 @@
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+def _parse_datetime(valor):
+    if valor is None or isinstance(valor, datetime):
+        return valor
+    # A API devolve "2024-01-01T00:00:00.000Z"; fromisoformat do 3.9 não aceita o "Z"
+    return datetime.fromisoformat(valor.replace("Z", "+00:00"))
+
+
+def _get(obj, nome):
+    """Lê um campo de um objeto do tweepy ou do dict bruto da API"""
+    if isinstance(obj, dict):
+        return obj.get(nome)
+    return getattr(obj, nome, None)
+
+
+@dataclass
+class TweetRecord:
+    """Campos de um tweet usados pelo app"""
+    __slots__ = ("text", "created_at", "like_count", "retweet_count")
+    text: str
+    created_at: datetime
+    like_count: int
+    retweet_count: int
+
+    @property
+    def engagement(self):
+        return self.like_count + self.retweet_count
+
+    @classmethod
+    def from_api(cls, tweet):
+        """Converte um tweepy.Tweet (ou o dict bruto da API)"""
+        metricas = _get(tweet, "public_metrics") or {}
+        return cls(
+            text=_get(tweet, "text") or "",
+            created_at=_parse_datetime(_get(tweet, "created_at")),
+            like_count=metricas.get("like_count", 0),
+            retweet_count=metricas.get("retweet_count", 0),
+        )
+
+
+@dataclass
+class UserRecord:
+    """Campos de um usuário (o fã ou uma conta seguida) usados pelo app"""
+    __slots__ = ("id", "username", "name", "description", "followers_count", "following_count",
+                 "tweet_count", "listed_count")
+    id: str
+    username: str
+    name: str
+    description: str
+    followers_count: int
+    following_count: int
+    tweet_count: int
+    listed_count: int
+
+    @classmethod
+    def from_api(cls, user):
+        """Converte um tweepy.User (ou o dict bruto da API)"""
+        metricas = _get(user, "public_metrics") or {}
+        return cls(
+            id=str(_get(user, "id")),
+            username=_get(user, "username") or "",
+            name=_get(user, "name") or "",
+            description=_get(user, "description") or "",
+            followers_count=metricas.get("followers_count"),
+            following_count=metricas.get("following_count"),
+            tweet_count=metricas.get("tweet_count"),
+            listed_count=metricas.get("listed_count"),
+        )
+
+
+def _to_columns(records, cls):
+    return {nome: [getattr(r, nome) for r in records] for nome in cls.__slots__}
+
+
+def _from_columns(colunas, cls):
+    if not colunas:
+        return []
+    return [cls(*valores) for valores in zip(*(colunas[nome] for nome in cls.__slots__))]
+
+
+@dataclass
+class TwitterProfile:
+    """Resultado da análise de um perfil, pronto para cache e disco
+
+    `to_dict` usa só tipos JSON e guarda tweets e contas seguidas em
+    colunas (uma lista por campo), o que deixa o payload pequeno e
+    barato de copiar entre processos.
+    """
+    user: UserRecord
+    tweets: list = field(default_factory=list)
+    following: list = field(default_factory=list)
+    metrics: dict = field(default_factory=dict)
+
+    def to_dict(self):
+        tweets = _to_columns(self.tweets, TweetRecord)
+        tweets["created_at"] = [d.isoformat() if d else None for d in tweets["created_at"]]
+        return {
+            "user": {nome: getattr(self.user, nome) for nome in UserRecord.__slots__},
+            "tweets": tweets,
+            "following": _to_columns(self.following, UserRecord),
+            "metrics": dict(self.metrics),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        tweets = _from_columns(data.get("tweets"), TweetRecord)
+        for tweet in tweets:
+            tweet.created_at = _parse_datetime(tweet.created_at)
+        return cls(
+            user=UserRecord(**data["user"]),
+            tweets=tweets,
+            following=_from_columns(data.get("following"), UserRecord),
+            metrics=dict(data.get("metrics", {})),
+        )
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls.from_dict(json.loads(payload))
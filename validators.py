@@ -0,0 +1,36 @@
+def validate_cpf(cpf: str) -> bool:
+    """Valida um CPF brasileiro"""
+    cpf = ''.join(filter(str.isdigit, cpf))
+    
+    if len(cpf) != 11:
+        return False
+    
+    # Verifica dígitos repetidos
+    if cpf == cpf[0] * 11:
+        return False
+    
+    # Calcula o primeiro dígito verificador
+    soma = 0
+    for i in range(9):
+        soma += int(cpf[i]) * (10 - i)
+    resto = 11 - (soma % 11)
+    digito1 = resto if resto < 10 else 0
+    
+    # Calcula o segundo dígito verificador
+    soma = 0
+    for i in range(10):
+        soma += int(cpf[i]) * (11 - i)
+    resto = 11 - (soma % 11)
+    digito2 = resto if resto < 10 else 0
+    
+    return cpf[-2:] == f"{digito1}{digito2}"
+
+def validate_email_address(email: str) -> bool:
+    """Valida um endereço de email"""
+    from email_validator import validate_email, EmailNotValidError
+
+    try:
+        v = validate_email(email)
+        return True
+    except EmailNotValidError:
+        return False
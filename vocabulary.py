@@ -0,0 +1,277 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+# Vocabulário de e-sports externo, recarregado quando o arquivo muda
+VOCABULARY_PATH = os.getenv(
+    "ESPORTS_VOCABULARY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "esports_vocabulary.json"),
+)
+VOCABULARY_CHECK_INTERVAL = float(os.getenv("ESPORTS_VOCABULARY_CHECK_INTERVAL", "2"))
+
+# Seções do arquivo e a categoria de cada uma
+CATEGORIAS = {"organizacoes": "organizacao", "jogos": "jogo"}
+# Aliases mais curtos ("g2", "t1", "loud", "navi") aparecem por acaso dentro de handles comuns
+MIN_HANDLE_ALIAS = 5
+
+
+def _is_boundary(texto, inicio, fim):
+    """Verifica se o trecho [inicio, fim) não está colado em letras ou números"""
+    if inicio > 0 and texto[inicio - 1].isalnum():
+        return False
+    if fim < len(texto) and texto[fim].isalnum():
+        return False
+    return True
+
+
+class KeywordMatcher:
+    """Autômato Aho-Corasick que encontra todos os termos de um vocabulário em uma única passada
+
+    Recebe uma lista de termos ou um dict termo -> categoria. A busca é
+    case-insensitive e, por padrão, só aceita palavras inteiras ("lol" não
+    casa dentro de "lollipop").
+    """
+
+    def __init__(self, termos):
+        if not isinstance(termos, dict):
+            termos = dict.fromkeys(termos)
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.terms = {}  # termo -> (posição no vocabulário, categoria)
+
+        for termo, categoria in termos.items():
+            termo = termo.strip().lower()
+            if not termo or termo in self.terms:
+                continue
+            self.terms[termo] = (len(self.terms), categoria)
+            node = 0
+            for ch in termo:
+                proximo = self._goto[node].get(ch)
+                if proximo is None:
+                    proximo = len(self._goto)
+                    self._goto[node][ch] = proximo
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = proximo
+            self._out[node].append(termo)
+
+        # Links de falha em largura; cada nó herda as saídas do seu sufixo
+        fila = deque(self._goto[0].values())
+        while fila:
+            node = fila.popleft()
+            for ch, proximo in self._goto[node].items():
+                fila.append(proximo)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[proximo] = self._goto[f].get(ch, 0)
+                self._out[proximo] = self._out[proximo] + self._out[self._fail[proximo]]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def iter_matches(self, texto, whole_words=True, categories=None):
+        """Gera (início, fim, termo, categoria) para cada ocorrência no texto em minúsculas"""
+        texto = texto.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(texto):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for termo in out[node]:
+                inicio = i - len(termo) + 1
+                if whole_words and not _is_boundary(texto, inicio, i + 1):
+                    continue
+                categoria = self.terms[termo][1]
+                if categories is not None and categoria not in categories:
+                    continue
+                yield inicio, i + 1, termo, categoria
+
+    def find_all(self, texto, whole_words=True, categories=None):
+        """Todas as ocorrências com posições"""
+        return list(self.iter_matches(texto, whole_words, categories))
+
+    def find_terms(self, texto, whole_words=True, categories=None):
+        """Termos distintos encontrados, na ordem do vocabulário"""
+        encontrados = {termo for _, _, termo, _ in self.iter_matches(texto, whole_words, categories)}
+        return sorted(encontrados, key=lambda termo: self.terms[termo][0])
+
+    def contains_any(self, texto, whole_words=True, categories=None):
+        """Indica se há ao menos uma ocorrência (para na primeira)"""
+        return next(self.iter_matches(texto, whole_words, categories), None) is not None
+
+
+def _compact(termo):
+    return "".join(c for c in termo.lower() if c.isalnum())
+
+
+@lru_cache(maxsize=256)
+def matcher_for(termos):
+    """Autômato para uma tupla de termos avulsos (ex.: interesses do usuário), compilado uma vez"""
+    return KeywordMatcher(termos)
+
+
+class Vocabulary:
+    """Vocabulário compilado: nomes canônicos, aliases, categorias e o autômato de busca"""
+
+    def __init__(self, entries):
+        self.entries = {}  # nome canônico -> entrada completa (aliases, categoria, metadados)
+        self.aliases = {}  # alias em minúsculas -> nome canônico
+        self.by_category = {}
+        self.accounts = {}  # handle do Twitter em minúsculas -> nome canônico da organização
+        self.account_ids = {}  # ID da conta no Twitter -> nome canônico da organização
+        self.handle_aliases = []  # (alias sem separadores, nome canônico) das organizações, do maior para o menor
+        termos = {}
+
+        for entry in entries:
+            nome = entry["nome"].strip().lower()
+            if nome in self.entries:
+                continue
+            categoria = entry["categoria"]
+            self.entries[nome] = dict(entry, nome=nome)
+            self.by_category.setdefault(categoria, []).append(nome)
+            for termo in [nome, *entry.get("aliases", [])]:
+                termo = termo.strip().lower()
+                if termo and termo not in self.aliases:
+                    self.aliases[termo] = nome
+                    termos[termo] = categoria
+            for handle in entry.get("twitter", []):
+                self.accounts.setdefault(handle.strip().lstrip("@").lower(), nome)
+            for conta_id in entry.get("twitter_ids", []):
+                self.account_ids.setdefault(str(conta_id), nome)
+
+        self.matcher = KeywordMatcher(termos)
+        handle_aliases = {}
+        for termo, nome in self.aliases.items():
+            compacto = _compact(termo)
+            if termos[termo] == "organizacao" and len(compacto) >= MIN_HANDLE_ALIAS:
+                handle_aliases.setdefault(compacto, nome)
+        self.handle_aliases = sorted(handle_aliases.items(), key=lambda item: -len(item[0]))
+        self._ordem = {nome: i for i, nome in enumerate(self.entries)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Monta o vocabulário a partir do conteúdo do arquivo JSON"""
+        entries = []
+        for secao, categoria in CATEGORIAS.items():
+            for entry in data.get(secao, []):
+                if isinstance(entry, str):
+                    entry = {"nome": entry}
+                entries.append({**entry, "categoria": categoria})
+        return cls(entries)
+
+    @classmethod
+    def load(cls, path=VOCABULARY_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def names(self, category=None):
+        """Nomes canônicos, de uma categoria ou de todas"""
+        if category is None:
+            return list(self.entries)
+        return list(self.by_category.get(category, []))
+
+    def canonical(self, termo):
+        """Nome canônico de um alias (ou None se não for conhecido)"""
+        return self.aliases.get(termo.strip().lower())
+
+    def account_owner(self, account_id=None, username=None):
+        """Organização dona de uma conta conhecida do Twitter, pelo ID ou pelo handle (None se não for conhecida)"""
+        if account_id is not None:
+            nome = self.account_ids.get(str(account_id))
+            if nome:
+                return nome
+        if username:
+            return self.accounts.get(username.lstrip("@").lower())
+        return None
+
+    def handle_owner(self, username):
+        """Organização cujo nome abre ou fecha o handle ("furiagg", "ofurianews"), ou None
+
+        Só aliases com ao menos MIN_HANDLE_ALIAS caracteres, comparados sem
+        espaços e pontuação; o meio do handle não conta.
+        """
+        handle = _compact(username)
+        for alias, nome in self.handle_aliases:
+            if handle.startswith(alias) or handle.endswith(alias):
+                return nome
+        return None
+
+    def find(self, texto, whole_words=True, categories=None):
+        """Nomes canônicos mencionados no texto, na ordem do vocabulário"""
+        encontrados = {
+            self.aliases[termo]
+            for _, _, termo, _ in self.matcher.iter_matches(texto, whole_words, categories)
+        }
+        return sorted(encontrados, key=self._ordem.__getitem__)
+
+    def contains_any(self, texto, whole_words=True, categories=None):
+        """Indica se o texto menciona algum termo do vocabulário"""
+        return self.matcher.contains_any(texto, whole_words, categories)
+
+    def find_interests(self, texto, interesses, encontrados=None):
+        """Interesses do usuário mencionados no texto, considerando os aliases de cada um
+
+        `encontrados` permite reaproveitar o resultado de `find` do mesmo texto.
+        """
+        interesses = [i.strip().lower() for i in interesses if isinstance(i, str) and i.strip()]
+        if encontrados is None:
+            encontrados = self.find(texto)
+        encontrados = set(encontrados)
+
+        # Interesses fora do vocabulário são buscados como termos avulsos
+        avulsos = tuple(i for i in interesses if self.canonical(i) is None)
+        if avulsos:
+            encontrados.update(matcher_for(avulsos).find_terms(texto))
+        return [i for i in interesses if (self.canonical(i) or i) in encontrados]
+
+
+class VocabularyStore:
+    """Mantém o vocabulário compilado e o recarrega quando o arquivo é alterado"""
+
+    def __init__(self, path=VOCABULARY_PATH, check_interval=VOCABULARY_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.error = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._vocabulary = None
+
+    def get(self):
+        """Vocabulário atual, recompilado se o arquivo mudou desde a última verificação"""
+        agora = time.monotonic()
+        if self._vocabulary is not None and agora - self._checked_at < self.check_interval:
+            return self._vocabulary
+
+        with self._lock:
+            self._checked_at = agora
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != self._mtime:
+                    self._vocabulary = Vocabulary.load(self.path)
+                    self._mtime = mtime
+                    self.reloads += 1
+                    self.error = None
+            except (OSError, ValueError, KeyError) as e:
+                # Arquivo inválido durante a edição: mantém a última versão boa
+                self.error = e
+                if self._vocabulary is None:
+                    raise
+            return self._vocabulary
+
+
+_store = VocabularyStore()
+
+
+def get_vocabulary():
+    """Vocabulário de e-sports compartilhado pelo processo"""
+    return _store.get()